@@ -0,0 +1,14 @@
+"""
+ASGI config for stock-rag project.
+
+Serve with uvicorn so async views run on one long-lived event loop per
+worker, which lets the per-loop API clients keep their connections.
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'settings')
+
+application = get_asgi_application()
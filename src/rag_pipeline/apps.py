@@ -1,6 +1,36 @@
+import threading
 from django.apps import AppConfig
 
 
 class RagPipelineConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'rag_pipeline'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from .utils.vector_types import register_on_connection_created
+
+        # Decode halfvec columns natively instead of as text
+        connection_created.connect(register_on_connection_created, dispatch_uid='rag_pipeline_vector_types')
+
+        self._query_processor = None
+        self._query_processor_lock = threading.Lock()
+
+    @property
+    def query_processor(self):
+        """
+        Process-wide QueryProcessor shared by all requests.
+
+        Created on first use rather than in ready() so management commands
+        don't build API clients they never use. The services it holds are
+        safe to share: sync clients are thread-safe and async clients are
+        kept per event loop.
+        """
+        if self._query_processor is None:
+            with self._query_processor_lock:
+                if self._query_processor is None:
+                    from .services.query_processor import QueryProcessor
+
+                    self._query_processor = QueryProcessor()
+
+        return self._query_processor
@@ -1,7 +1,9 @@
+from typing import Dict, List
 from django.core.management.base import BaseCommand
 from django.conf import settings
 from rag_pipeline.services.document_processor import DocumentProcessor
 from rag_pipeline.models import Document
+from rag_pipeline.utils.loop_local import async_to_sync_closing
 
 
 class Command(BaseCommand):
@@ -37,13 +39,23 @@ class Command(BaseCommand):
         if options['year']:
             documents = [doc for doc in documents if doc['year'] == options['year']]
 
+        # One event loop for the whole run; the async OpenAI client is bound
+        # to it and closed before the loop is discarded
+        success_count = async_to_sync_closing(self._ingest)(processor, documents)
+
+        self.stdout.write(
+            self.style.SUCCESS(f'\n✓ Document ingestion completed! {success_count} documents processed.')
+        )
+
+    async def _ingest(self, processor: DocumentProcessor, documents: List[Dict]) -> int:
+        """Process each document on the event loop and return the number ingested."""
         success_count = 0
 
         for doc_info in documents:
             self.stdout.write(f'Processing {doc_info["company"]} {doc_info["year"]} 10-K...')
 
             # Create Django document record
-            django_doc, created = Document.objects.get_or_create(
+            django_doc, _ = await Document.objects.aget_or_create(
                 company=doc_info['company'],
                 year=doc_info['year'],
                 defaults={
@@ -53,18 +65,17 @@ class Command(BaseCommand):
                 }
             )
 
-            if not created:
-                self.stdout.write(f'  Document already exists, skipping...')
-                continue
-
-            # Process document
-            result = processor.process_document(
+            # Process document (a no-op when the filing content is unchanged)
+            result = await processor.aprocess_document(
                 doc_info['url'],
                 doc_info['company'],
                 doc_info['year']
             )
 
-            if result['success']:
+            if result.get('skipped'):
+                self.stdout.write(f'  Document content unchanged, skipping...')
+                success_count += 1
+            elif result['success']:
                 self.stdout.write(
                     self.style.SUCCESS(
                         f'  ✓ Successfully processed {result["chunk_count"]} chunks'
@@ -76,8 +87,6 @@ class Command(BaseCommand):
                     self.style.ERROR(f'  ✗ Failed: {result["error"]}')
                 )
                 django_doc.status = 'failed'
-                django_doc.save()
+                await django_doc.asave()
 
-        self.stdout.write(
-            self.style.SUCCESS(f'\n✓ Document ingestion completed! {success_count} documents processed.')
-        )
+        return success_count
@@ -1,61 +1,99 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
-from django.db import connection
+from django.db import connection, transaction
 from rag_pipeline.services.embedding_service import EmbeddingService
+from rag_pipeline.utils.hnsw import create_year_index, year_index_name
+from rag_pipeline.utils.pg_copy import copy_rows
+
+PENDING_CHUNKS_QUERY = """
+    SELECT c.id, d.year, c.chunk_text
+    FROM chunks c
+    JOIN documents d ON c.document_id = d.id
+    LEFT JOIN embeddings e ON c.id = e.chunk_id
+    WHERE e.chunk_id IS NULL
+"""
 
 
 class Command(BaseCommand):
     help = 'Populate embeddings for existing chunks (if not already generated)'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=512,
+            help='Number of chunks fetched, embedded and stored per batch',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write('Populating embeddings for existing chunks...')
 
         embedding_service = EmbeddingService()
+        batch_size = options['batch_size']
 
         try:
             with connection.cursor() as cursor:
-                # Find chunks without embeddings
-                cursor.execute("""
-                    SELECT c.id, c.chunk_text
-                    FROM chunks c
-                    LEFT JOIN embeddings e ON c.id = e.chunk_id
-                    WHERE e.chunk_id IS NULL
-                """)
+                cursor.execute(f"SELECT COUNT(*) FROM ({PENDING_CHUNKS_QUERY}) pending")
+                pending_count = cursor.fetchone()[0]
 
-                chunks_to_process = cursor.fetchall()
+            if not pending_count:
+                self.stdout.write('No chunks need embedding generation.')
+                return
 
-                if not chunks_to_process:
-                    self.stdout.write('No chunks need embedding generation.')
-                    return
+            self.stdout.write(f'Found {pending_count} chunks to process...')
 
-                self.stdout.write(f'Found {len(chunks_to_process)} chunks to process...')
+            # Stream pending chunks through a server-side cursor instead of
+            # loading them all; WITH HOLD keeps it open across batch commits
+            connection.ensure_connection()
+            pending = connection.connection.cursor(name='pending_chunks', withhold=True)
+            pending.itersize = batch_size
 
-                processed_count = 0
-
-                for chunk_id, chunk_text in chunks_to_process:
-                    try:
-                        # Generate embedding
-                        embedding = embedding_service.generate_embedding(chunk_text)
-                        embedding_str = '[' + ','.join(map(str, embedding)) + ']'
+            processed_count = 0
+            loaded_years = set()
 
-                        # Store embedding
-                        cursor.execute("""
-                            INSERT INTO embeddings (chunk_id, embedding, model_version)
-                            VALUES (%s, %s::vector, %s)
-                        """, [chunk_id, embedding_str, 'text-embedding-3-small'])
+            try:
+                pending.execute(PENDING_CHUNKS_QUERY)
 
-                        processed_count += 1
+                while rows := pending.fetchmany(batch_size):
+                    try:
+                        embeddings = embedding_service.generate_embeddings_concurrent(
+                            [chunk_text for _, _, chunk_text in rows]
+                        )
 
-                        if processed_count % 10 == 0:
-                            self.stdout.write(f'  Processed {processed_count} chunks...')
+                        # Commit per batch so progress survives a crash
+                        with transaction.atomic(), connection.cursor() as cursor:
+                            copy_rows(
+                                cursor,
+                                'embeddings',
+                                ['chunk_id', 'year', 'embedding', 'model_version'],
+                                (
+                                    (chunk_id, year, embedding_service.format_for_pgvector(embedding), 'text-embedding-3-small')
+                                    for (chunk_id, year, _), embedding in zip(rows, embeddings)
+                                ),
+                                batch_size=settings.INGEST_BULK_BATCH_SIZE
+                            )
+
+                        processed_count += len(rows)
+                        loaded_years.update(year for _, year, _ in rows)
+                        self.stdout.write(f'  Processed {processed_count} chunks...')
 
                     except Exception as e:
                         self.stdout.write(
-                            self.style.ERROR(f'  Failed to process chunk {chunk_id}: {str(e)}')
+                            self.style.ERROR(f'  Failed to process batch of {len(rows)} chunks: {str(e)}')
                         )
+            finally:
+                pending.close()
+
+            # Queries search the per-year partial HNSW indexes, so make sure
+            # every year that received embeddings has one
+            with connection.cursor() as cursor:
+                for year in sorted(loaded_years):
+                    create_year_index(cursor, year)
+                    self.stdout.write(self.style.SUCCESS(f'✓ HNSW index {year_index_name(year)} ready'))
 
-                self.stdout.write(
-                    self.style.SUCCESS(f'✓ Embedding population completed! {processed_count} embeddings generated.')
-                )
+            self.stdout.write(
+                self.style.SUCCESS(f'✓ Embedding population completed! {processed_count} embeddings generated.')
+            )
 
         except Exception as e:
             self.stdout.write(self.style.ERROR(f'✗ Embedding population failed: {str(e)}'))
@@ -1,10 +1,20 @@
 from django.core.management.base import BaseCommand
 from django.db import connection
+from rag_pipeline.utils.hnsw import (
+    configure_hnsw_params, create_search_function, create_year_index, set_ef_search, year_index_name
+)
 
 
 class Command(BaseCommand):
     help = 'Setup pgvector extension and create necessary tables'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild-index',
+            action='store_true',
+            help='Drop and rebuild the per-year HNSW indexes with parameters sized for the current vector counts',
+        )
+
     def handle(self, *args, **options):
         self.stdout.write('Setting up pgvector extension...')
 
@@ -22,8 +32,8 @@ class Command(BaseCommand):
                         year INTEGER NOT NULL,
                         filing_date DATE NOT NULL,
                         url TEXT NOT NULL,
-                        html_content TEXT,
                         parsed_text TEXT,
+                        content_sha256 CHAR(64),
                         created_at TIMESTAMP DEFAULT NOW()
                     );
                 """)
@@ -47,24 +57,53 @@ class Command(BaseCommand):
                 cursor.execute("""
                     CREATE TABLE IF NOT EXISTS embeddings (
                         chunk_id UUID PRIMARY KEY REFERENCES chunks(id) ON DELETE CASCADE,
-                        embedding VECTOR(1536) NOT NULL,
+                        year INTEGER NOT NULL,
+                        embedding HALFVEC(1536) NOT NULL,
                         model_version VARCHAR(50) DEFAULT 'text-embedding-3-small',
                         created_at TIMESTAMP DEFAULT NOW()
                     );
                 """)
                 self.stdout.write(self.style.SUCCESS('✓ embeddings table created'))
 
-                # Create HNSW index
+                # Create embedding cache table ((content hash, model) -> embedding)
                 cursor.execute("""
-                    CREATE INDEX IF NOT EXISTS embeddings_embedding_idx ON embeddings USING hnsw (embedding vector_cosine_ops)
-                    WITH (m = 16, ef_construction = 200);
+                    CREATE TABLE IF NOT EXISTS embedding_cache (
+                        text_hash BYTEA NOT NULL,
+                        embedding HALFVEC(1536) NOT NULL,
+                        model VARCHAR(50) NOT NULL,
+                        created_at TIMESTAMP DEFAULT NOW(),
+                        PRIMARY KEY (text_hash, model)
+                    );
                 """)
-                self.stdout.write(self.style.SUCCESS('✓ HNSW index created'))
+                self.stdout.write(self.style.SUCCESS('✓ embedding_cache table created'))
+
+                # One partial HNSW index per filing year, replacing the
+                # single index over every year's vectors
+                cursor.execute("DROP INDEX IF EXISTS embeddings_embedding_idx;")
+
+                cursor.execute("SELECT DISTINCT year FROM embeddings ORDER BY year;")
+                years = [row[0] for row in cursor.fetchall()]
+
+                ef_search = configure_hnsw_params(0)['ef_search']
+                for year in years:
+                    params = create_year_index(cursor, year, rebuild=options['rebuild_index'])
+                    ef_search = max(ef_search, params['ef_search'])
+                    self.stdout.write(self.style.SUCCESS(
+                        f"✓ HNSW index {year_index_name(year)} created "
+                        f"(m={params['m']}, ef_construction={params['ef_construction']})"
+                    ))
+
+                set_ef_search(ef_search)
+                self.stdout.write(self.style.SUCCESS(f"✓ hnsw.ef_search set to {ef_search}"))
+
+                create_search_function(cursor)
+                self.stdout.write(self.style.SUCCESS('✓ search_year_embeddings function created'))
 
                 # Create additional indexes
                 cursor.execute("CREATE INDEX IF NOT EXISTS documents_company_year_idx ON documents (company, year);")
                 cursor.execute("CREATE INDEX IF NOT EXISTS chunks_document_id_idx ON chunks (document_id);")
                 cursor.execute("CREATE INDEX IF NOT EXISTS chunks_section_idx ON chunks (section);")
+                cursor.execute("CREATE INDEX IF NOT EXISTS embeddings_year_idx ON embeddings (year);")
                 self.stdout.write(self.style.SUCCESS('✓ Additional indexes created'))
 
             self.stdout.write(self.style.SUCCESS('\n✓ pgvector setup completed successfully!'))
@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Store embeddings as halfvec (fp16) instead of vector (fp32).
+
+    The embeddings table is created by the setup_pgvector command, so this
+    only converts it when it already exists. The HNSW index is rebuilt with
+    the halfvec operator class; run `setup_pgvector --rebuild-index` to size
+    it for the current vector count.
+    """
+
+    dependencies = [
+        ('rag_pipeline', '0002_chunk_embedding'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DO $$
+                BEGIN
+                    IF to_regclass('embeddings') IS NOT NULL THEN
+                        DROP INDEX IF EXISTS embeddings_embedding_idx;
+                        ALTER TABLE embeddings
+                            ALTER COLUMN embedding TYPE halfvec(1536) USING embedding::halfvec(1536);
+                        CREATE INDEX embeddings_embedding_idx ON embeddings
+                            USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
+                    END IF;
+                END $$;
+            """,
+        ),
+    ]
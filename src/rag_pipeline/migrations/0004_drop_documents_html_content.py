@@ -0,0 +1,19 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Drop the raw HTML column from the documents table created by setup_pgvector.
+
+    Only parsed_text is kept; raw filings can be archived to RAW_HTML_DIR instead.
+    """
+
+    dependencies = [
+        ('rag_pipeline', '0003_embeddings_halfvec'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="ALTER TABLE IF EXISTS documents DROP COLUMN IF EXISTS html_content;",
+        ),
+    ]
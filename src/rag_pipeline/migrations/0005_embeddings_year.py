@@ -0,0 +1,47 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Denormalize the filing year onto embeddings and index each year separately.
+
+    The single HNSW index is replaced by one partial index per year, matching
+    the year filter every query applies. Run `setup_pgvector --rebuild-index`
+    to size them for the current vector counts.
+    """
+
+    dependencies = [
+        ('rag_pipeline', '0004_drop_documents_html_content'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DO $$
+                DECLARE
+                    embedding_year INTEGER;
+                BEGIN
+                    IF to_regclass('embeddings') IS NOT NULL THEN
+                        ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS year INTEGER;
+                        UPDATE embeddings e
+                            SET year = d.year
+                            FROM chunks c
+                            JOIN documents d ON c.document_id = d.id
+                            WHERE c.id = e.chunk_id AND e.year IS NULL;
+                        ALTER TABLE embeddings ALTER COLUMN year SET NOT NULL;
+                        CREATE INDEX IF NOT EXISTS embeddings_year_idx ON embeddings (year);
+
+                        DROP INDEX IF EXISTS embeddings_embedding_idx;
+                        FOR embedding_year IN SELECT DISTINCT year FROM embeddings LOOP
+                            EXECUTE format(
+                                'CREATE INDEX IF NOT EXISTS %I ON embeddings '
+                                'USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64) '
+                                'WHERE year = %s',
+                                'embeddings_' || embedding_year || '_hnsw', embedding_year
+                            );
+                        END LOOP;
+                    END IF;
+                END $$;
+            """,
+        ),
+    ]
@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Store a SHA-256 of the fetched filing on the documents table.
+
+    Re-ingesting a filing whose content hash is unchanged skips parsing,
+    embedding and inserts entirely.
+    """
+
+    dependencies = [
+        ('rag_pipeline', '0005_embeddings_year'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="ALTER TABLE IF EXISTS documents ADD COLUMN IF NOT EXISTS content_sha256 CHAR(64);",
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Normalize stored embeddings and index them for inner product search.
+
+    For unit vectors inner product orders results exactly like cosine
+    distance while skipping the norm computation per comparison. The
+    per-year HNSW indexes are dropped before the rewrite and recreated with
+    halfvec_ip_ops; run `setup_pgvector --rebuild-index` to size them for
+    the current vector counts.
+    """
+
+    dependencies = [
+        ('rag_pipeline', '0006_documents_content_sha256'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DO $$
+                DECLARE
+                    embedding_year INTEGER;
+                BEGIN
+                    IF to_regclass('embeddings') IS NOT NULL THEN
+                        FOR embedding_year IN SELECT DISTINCT year FROM embeddings LOOP
+                            EXECUTE format('DROP INDEX IF EXISTS %I', 'embeddings_' || embedding_year || '_hnsw');
+                        END LOOP;
+
+                        UPDATE embeddings SET embedding = l2_normalize(embedding);
+
+                        FOR embedding_year IN SELECT DISTINCT year FROM embeddings LOOP
+                            EXECUTE format(
+                                'CREATE INDEX IF NOT EXISTS %I ON embeddings '
+                                'USING hnsw (embedding halfvec_ip_ops) WITH (m = 16, ef_construction = 64) '
+                                'WHERE year = %s',
+                                'embeddings_' || embedding_year || '_hnsw', embedding_year
+                            );
+                        END LOOP;
+                    END IF;
+                END $$;
+            """,
+        ),
+    ]
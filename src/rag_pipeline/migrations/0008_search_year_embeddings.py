@@ -0,0 +1,30 @@
+from django.db import migrations
+from rag_pipeline.utils.hnsw import create_search_function
+
+
+def forwards(apps, schema_editor):
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass('embeddings');")
+        if cursor.fetchone()[0] is not None:
+            create_search_function(cursor)
+
+
+class Migration(migrations.Migration):
+    """
+    Run retrieval through the search_year_embeddings SQL function.
+
+    The function does the cheap HNSW scan and, when its best match is weak,
+    the wider one, so retrieval is a single round trip either way. Like the
+    embeddings table it is also created by `setup_pgvector`.
+    """
+
+    dependencies = [
+        ('rag_pipeline', '0007_embeddings_inner_product'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            forwards,
+            reverse_code=migrations.RunPython.noop,
+        ),
+    ]
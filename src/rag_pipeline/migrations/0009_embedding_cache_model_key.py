@@ -0,0 +1,28 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Key embedding_cache on (text_hash, model) instead of text_hash alone.
+
+    Lookups filter on the model, so with a text_hash-only key a model change
+    could never store the new model's vectors and every lookup missed.
+    """
+
+    dependencies = [
+        ('rag_pipeline', '0008_search_year_embeddings'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            sql="""
+                DO $$
+                BEGIN
+                    IF to_regclass('embedding_cache') IS NOT NULL THEN
+                        ALTER TABLE embedding_cache DROP CONSTRAINT IF EXISTS embedding_cache_pkey;
+                        ALTER TABLE embedding_cache ADD PRIMARY KEY (text_hash, model);
+                    END IF;
+                END $$;
+            """,
+        ),
+    ]
@@ -1,5 +1,4 @@
 from django.db import models
-from django.utils import timezone
 from pgvector.django import VectorField
 
 
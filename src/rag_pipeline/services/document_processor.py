@@ -1,15 +1,38 @@
+import asyncio
+import gzip
+import hashlib
 import logging
-import requests
-from bs4 import BeautifulSoup
-from typing import Dict, List
-from django.db import connection
+import uuid
+from asgiref.sync import sync_to_async
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from django.db import connection, transaction
+from django.utils import timezone
 from django.conf import settings
 from .embedding_service import EmbeddingService
 from ..utils.chunking import TextChunker
+from ..utils.hnsw import create_year_index
 from ..utils.html_parser import HTMLParser
+from ..utils.http_client import get_http_client
+from ..utils.loop_local import async_to_sync_closing
+from ..utils.pg_copy import copy_rows
 
 logger = logging.getLogger(__name__)
 
+# Browser-like headers sent with SEC EDGAR requests
+SEC_REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0',
+}
+
 
 class DocumentProcessor:
     """Service for processing and ingesting 10-K documents."""
@@ -18,11 +41,32 @@ class DocumentProcessor:
         self.embedding_service = EmbeddingService()
         self.chunker = TextChunker()
         self.html_parser = HTMLParser()
+        self.http_client = get_http_client()
 
     def process_document(self, url: str, company: str, year: int) -> Dict[str, any]:
         """
         Process a 10-K document from URL.
 
+        Synchronous entry point; runs aprocess_document on its own event loop.
+
+        Args:
+            url: Document URL
+            company: Company name
+            year: Filing year
+
+        Returns:
+            Processing result dictionary
+        """
+        return async_to_sync_closing(self.aprocess_document)(url, company, year)
+
+    async def aprocess_document(self, url: str, company: str, year: int) -> Dict[str, any]:
+        """
+        Process a 10-K document from URL.
+
+        Embedding batches are dispatched concurrently on the event loop with
+        the AsyncOpenAI client; blocking fetch and database steps run through
+        sync_to_async.
+
         Args:
             url: Document URL
             company: Company name
@@ -33,22 +77,42 @@ class DocumentProcessor:
         """
         try:
             # Fetch document
-            html_content = self._fetch_document(url)
+            html_content = await sync_to_async(self._fetch_document)(url)
+            content_sha256 = hashlib.sha256(html_content).hexdigest()
+
+            # Skip the whole pipeline if this exact filing is already stored
+            unchanged = await sync_to_async(self._find_unchanged_document)(company, year, content_sha256)
+            if unchanged:
+                return await sync_to_async(self._unchanged_result)(company, year, *unchanged)
 
             # Parse HTML content
             parsed_content = self.html_parser.parse_10k(html_content)
 
-            # Store document in database
-            document_id = self._store_document(url, company, year, html_content, parsed_content['full_text'])
+            # Store document in database; its content hash is only recorded
+            # once the load succeeds, so a failed run is retried in full
+            document_id = await sync_to_async(self._store_document)(url, company, year, parsed_content['full_text'])
+
+            # Optionally keep a compressed copy of the raw filing outside the database
+            if settings.RAW_HTML_DIR:
+                await sync_to_async(self._archive_html)(document_id, html_content)
+
+            # The raw filing is no longer needed; free it before embedding
+            del html_content
 
             # Chunk the text
             chunks = self.chunker.chunk_text(parsed_content['full_text'])
 
-            # Store chunks and generate embeddings
-            chunk_count = self._store_chunks_and_embeddings(document_id, chunks, parsed_content)
+            # Generate embeddings in concurrent batches
+            embeddings = await self._agenerate_chunk_embeddings(chunks)
+
+            # Store chunks and embeddings
+            chunk_count = await sync_to_async(self._store_chunks_and_embeddings)(document_id, year, chunks, embeddings, parsed_content)
+
+            # Mark this version as complete and replace any earlier one
+            await sync_to_async(self._finalize_document)(company, year, document_id, content_sha256)
 
             # Update document status
-            self._update_document_status(document_id, 'completed', chunk_count)
+            await sync_to_async(self._update_document_status)(company, year, 'completed', chunk_count)
 
             return {
                 'success': True,
@@ -64,26 +128,21 @@ class DocumentProcessor:
                 'error': str(e)
             }
 
-    def _fetch_document(self, url: str) -> str:
-        """Fetch document content from URL or file.
+    def _fetch_document(self, url: str) -> bytes:
+        """Fetch raw document bytes from URL or file.
+
+        Bytes are handed to the HTML parser as-is; it detects the charset
+        declared in the document, so no Python-side decode is needed.
 
         Note: SEC EDGAR blocks automated requests from Docker containers (403 Forbidden).
         For this POC, we use pre-downloaded files in sample_documents/ directory.
         """
         try:
             if url.startswith('file://'):
-                # Handle local file URLs with encoding detection
+                # Handle local file URLs
                 # This is our workaround for SEC blocking issues
                 file_path = url.replace('file://', '')
-                import chardet
-
-                # Detect encoding
                 with open(file_path, 'rb') as f:
-                    raw_data = f.read()
-                    encoding = chardet.detect(raw_data)['encoding']
-
-                # Read with detected encoding
-                with open(file_path, 'r', encoding=encoding) as f:
                     return f.read()
             else:
                 # Handle HTTP URLs with SEC-compliant headers
@@ -91,39 +150,56 @@ class DocumentProcessor:
                 import time
                 time.sleep(1)  # Be respectful to SEC servers
 
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-                    'Accept-Language': 'en-US,en;q=0.9',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Sec-Fetch-Dest': 'document',
-                    'Sec-Fetch-Mode': 'navigate',
-                    'Sec-Fetch-Site': 'none',
-                    'Sec-Fetch-User': '?1',
-                    'Cache-Control': 'max-age=0',
-                }
-
-                session = requests.Session()
-                session.headers.update(headers)
-
-                response = session.get(url, timeout=30)
-                response.raise_for_status()
-                return response.text
+                # Stream the (decompressed) body over the shared keep-alive client
+                with self.http_client.stream('GET', url, headers=SEC_REQUEST_HEADERS) as response:
+                    response.raise_for_status()
+
+                    content = bytearray()
+                    for chunk in response.iter_bytes(65536):
+                        content += chunk
+
+                    return bytes(content)
         except Exception as e:
             logger.error(f"Failed to fetch document from {url}: {str(e)}")
             raise
 
-    def _store_document(self, url: str, company: str, year: int, html_content: str, parsed_text: str) -> str:
+    def _find_unchanged_document(self, company: str, year: int, content_sha256: str) -> Optional[Tuple[str, int]]:
+        """Return (document_id, chunk_count) if this exact filing content is already stored."""
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT d.id, COUNT(c.id)
+                FROM documents d
+                LEFT JOIN chunks c ON c.document_id = d.id
+                WHERE d.company = %s AND d.year = %s AND d.content_sha256 = %s
+                GROUP BY d.id
+                HAVING COUNT(c.id) > 0
+                LIMIT 1
+            """, [company, year, content_sha256])
+
+            return cursor.fetchone()
+
+    def _unchanged_result(self, company: str, year: int, document_id: str, chunk_count: int) -> Dict[str, any]:
+        """Build the processing result for a filing whose content has not changed."""
+        logger.info(f"{company} {year} 10-K content unchanged, skipping processing")
+        self._update_document_status(company, year, 'completed', chunk_count)
+
+        return {
+            'success': True,
+            'skipped': True,
+            'document_id': str(document_id),
+            'chunk_count': chunk_count,
+            'sections_found': []
+        }
+
+    def _store_document(self, url: str, company: str, year: int, parsed_text: str) -> str:
         """Store document in PostgreSQL."""
         try:
             with connection.cursor() as cursor:
                 cursor.execute("""
-                    INSERT INTO documents (company, year, filing_date, url, html_content, parsed_text)
-                    VALUES (%s, %s, CURRENT_DATE, %s, %s, %s)
+                    INSERT INTO documents (company, year, filing_date, url, parsed_text)
+                    VALUES (%s, %s, CURRENT_DATE, %s, %s)
                     RETURNING id
-                """, [company, year, url, html_content, parsed_text])
+                """, [company, year, url, parsed_text])
 
                 return cursor.fetchone()[0]
 
@@ -131,39 +207,89 @@ class DocumentProcessor:
             logger.error(f"Failed to store document: {str(e)}")
             raise
 
-    def _store_chunks_and_embeddings(self, document_id: str, chunks: List[Dict], parsed_content: Dict) -> int:
-        """Store chunks and generate embeddings."""
+    def _finalize_document(self, company: str, year: int, document_id: str, content_sha256: str):
+        """
+        Record a fully loaded filing's content hash and delete its earlier versions.
+
+        Both happen in one transaction after chunks and embeddings are stored,
+        so only complete documents can match _find_unchanged_document.
+        Chunks and embeddings of deleted versions cascade.
+        """
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE documents SET content_sha256 = %s WHERE id = %s",
+                [content_sha256, document_id]
+            )
+            cursor.execute(
+                "DELETE FROM documents WHERE company = %s AND year = %s AND id <> %s",
+                [company, year, document_id]
+            )
+
+    def _archive_html(self, document_id: str, html_content: bytes):
+        """Write the raw filing to RAW_HTML_DIR as gzip-compressed HTML."""
         try:
-            chunk_count = 0
+            archive_dir = Path(settings.RAW_HTML_DIR)
+            archive_dir.mkdir(parents=True, exist_ok=True)
 
+            with gzip.open(archive_dir / f"{document_id}.html.gz", 'wb', compresslevel=6) as f:
+                f.write(html_content)
+
+        except Exception as e:
+            logger.warning(f"Failed to archive raw HTML for document {document_id}: {str(e)}")
+
+    async def _agenerate_chunk_embeddings(self, chunks: List[Dict]) -> List[List[float]]:
+        """Generate embeddings for all chunks, gathering batches under a concurrency limit."""
+        texts = [chunk['text'] for chunk in chunks]
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        semaphore = asyncio.Semaphore(self.embedding_service.max_concurrency())
+
+        async def embed_batch(batch: List[str]) -> List[List[float]]:
+            async with semaphore:
+                return await self.embedding_service.agenerate_embeddings_batch(batch)
+
+        results = await asyncio.gather(*(
+            embed_batch(texts[start:start + batch_size])
+            for start in range(0, len(texts), batch_size)
+        ))
+
+        return [embedding for batch in results for embedding in batch]
+
+    def _store_chunks_and_embeddings(self, document_id: str, year: int, chunks: List[Dict], embeddings: List[List[float]], parsed_content: Dict) -> int:
+        """Bulk load chunks and their precomputed embeddings with COPY."""
+        try:
+            # Chunk ids are generated here so embedding rows can reference
+            # them without a RETURNING round-trip per chunk
+            chunk_ids = [uuid.uuid4() for _ in chunks]
+
+            chunk_rows = (
+                (chunk_id, document_id, i, chunk['text'], chunk.get('section'), chunk.get('subsection'))
+                for i, (chunk_id, chunk) in enumerate(zip(chunk_ids, chunks))
+            )
+            embedding_rows = (
+                (chunk_id, year, self.embedding_service.format_for_pgvector(embedding), 'text-embedding-3-small')
+                for chunk_id, embedding in zip(chunk_ids, embeddings)
+            )
+
+            with transaction.atomic(), connection.cursor() as cursor:
+                chunk_count = copy_rows(
+                    cursor,
+                    'chunks',
+                    ['id', 'document_id', 'chunk_index', 'chunk_text', 'section', 'subsection'],
+                    chunk_rows,
+                    batch_size=settings.INGEST_BULK_BATCH_SIZE
+                )
+                copy_rows(
+                    cursor,
+                    'embeddings',
+                    ['chunk_id', 'year', 'embedding', 'model_version'],
+                    embedding_rows,
+                    batch_size=settings.INGEST_BULK_BATCH_SIZE
+                )
+
+            # Build this year's partial HNSW index after the bulk load if it
+            # does not exist yet; later loads are inserted incrementally
             with connection.cursor() as cursor:
-                for i, chunk in enumerate(chunks):
-                    # Store chunk
-                    cursor.execute("""
-                        INSERT INTO chunks (document_id, chunk_index, chunk_text, section, subsection)
-                        VALUES (%s, %s, %s, %s, %s)
-                        RETURNING id
-                    """, [
-                        document_id,
-                        i,
-                        chunk['text'],
-                        chunk.get('section'),
-                        chunk.get('subsection')
-                    ])
-
-                    chunk_id = cursor.fetchone()[0]
-
-                    # Generate embedding
-                    embedding = self.embedding_service.generate_embedding(chunk['text'])
-                    embedding_str = '[' + ','.join(map(str, embedding)) + ']'
-
-                    # Store embedding
-                    cursor.execute("""
-                        INSERT INTO embeddings (chunk_id, embedding, model_version)
-                        VALUES (%s, %s::vector, %s)
-                    """, [chunk_id, embedding_str, 'text-embedding-3-small'])
-
-                    chunk_count += 1
+                create_year_index(cursor, year)
 
             return chunk_count
 
@@ -171,21 +297,18 @@ class DocumentProcessor:
             logger.error(f"Failed to store chunks and embeddings: {str(e)}")
             raise
 
-    def _update_document_status(self, document_id: str, status: str, chunk_count: int):
+    def _update_document_status(self, company: str, year: int, status: str, chunk_count: int):
         """Update document status in Django model."""
         try:
             from ..models import Document
 
-            # Find the corresponding Django document
-            django_doc = Document.objects.filter(
-                company__icontains='Apple',  # This is a simplified lookup
-                year__isnull=False
-            ).first()
-
-            if django_doc:
-                django_doc.status = status
-                django_doc.chunk_count = chunk_count
-                django_doc.save()
+            # Single UPDATE on the (company, year) unique index; update()
+            # skips auto_now, so updated_at is set explicitly
+            Document.objects.filter(company=company, year=year).update(
+                status=status,
+                chunk_count=chunk_count,
+                updated_at=timezone.now()
+            )
 
         except Exception as e:
             logger.warning(f"Failed to update Django document status: {str(e)}")
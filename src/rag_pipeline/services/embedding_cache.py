@@ -0,0 +1,159 @@
+import hashlib
+import logging
+import threading
+import numpy as np
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+from django.conf import settings
+from django.db import connection, transaction
+from ..utils.vector_format import format_vector, parse_vector
+
+logger = logging.getLogger(__name__)
+
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+
+class MemoryLRU:
+    """Thread-safe in-process LRU of cache keys to float32 embeddings."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get_many(self, keys: Iterable) -> Dict:
+        """Return the cached embedding for every key present, marking each as recently used."""
+        hits = {}
+        with self.lock:
+            for key in keys:
+                embedding = self.entries.get(key)
+                if embedding is not None:
+                    self.entries.move_to_end(key)
+                    hits[key] = embedding
+
+        # Convert outside the lock
+        return {key: embedding.tolist() for key, embedding in hits.items()}
+
+    def set_many(self, embeddings: Dict):
+        """Store embeddings, evicting the least recently used keys beyond max_entries."""
+        # float32 arrays take ~6KB per 1536-d vector vs ~50KB as a list of floats
+        arrays = {key: np.asarray(embedding, dtype=np.float32) for key, embedding in embeddings.items()}
+
+        with self.lock:
+            for key, embedding in arrays.items():
+                self.entries[key] = embedding
+                self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+
+def get_memory_cache() -> Optional[MemoryLRU]:
+    """Return the process-wide in-memory embedding LRU, or None when disabled."""
+    global _memory_cache
+
+    if settings.EMBEDDING_MEMORY_CACHE_SIZE <= 0:
+        return None
+
+    if _memory_cache is None:
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                _memory_cache = MemoryLRU(settings.EMBEDDING_MEMORY_CACHE_SIZE)
+
+    return _memory_cache
+
+
+class EmbeddingCache:
+    """
+    Content-hash to embedding cache backed by the embedding_cache table.
+
+    A process-wide in-memory LRU sits in front of the table, so repeated
+    texts (e.g. identical queries) skip the database round-trip as well.
+    """
+
+    def __init__(self, model: str):
+        self.model = model
+        self.memory = get_memory_cache()
+
+    @staticmethod
+    def hash_text(text: str) -> bytes:
+        """Return the cache key for a text."""
+        return hashlib.sha256(text.encode('utf-8')).digest()
+
+    def get_many(self, text_hashes: Iterable[bytes]) -> Dict[bytes, List[float]]:
+        """
+        Look up cached embeddings.
+
+        Args:
+            text_hashes: Cache keys from hash_text
+
+        Returns:
+            Dictionary of cache key to embedding for every hit
+        """
+        text_hashes = list(text_hashes)
+        if not text_hashes:
+            return {}
+
+        embeddings = {}
+        if self.memory:
+            memory_hits = self.memory.get_many((self.model, text_hash) for text_hash in text_hashes)
+            embeddings = {text_hash: embedding for (_, text_hash), embedding in memory_hits.items()}
+            text_hashes = [text_hash for text_hash in text_hashes if text_hash not in embeddings]
+            if not text_hashes:
+                return embeddings
+
+        embeddings.update(self._get_many_from_db(text_hashes))
+        return embeddings
+
+    def _get_many_from_db(self, text_hashes: List[bytes]) -> Dict[bytes, List[float]]:
+        """Look up embeddings in the embedding_cache table and keep hits in memory."""
+        try:
+            # Savepoint so a cache failure can't abort an enclosing transaction
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT text_hash, embedding::text
+                    FROM embedding_cache
+                    WHERE text_hash = ANY(%s) AND model = %s
+                """, [text_hashes, self.model])
+
+                embeddings = {bytes(text_hash): parse_vector(embedding) for text_hash, embedding in cursor.fetchall()}
+
+            if self.memory:
+                self.memory.set_many({(self.model, text_hash): embedding for text_hash, embedding in embeddings.items()})
+
+            return embeddings
+
+        except Exception as e:
+            logger.warning(f"Embedding cache lookup failed: {str(e)}")
+            return {}
+
+    def set_many(self, embeddings: Dict[bytes, List[float]]):
+        """
+        Store new embeddings, ignoring keys that are already cached.
+
+        Args:
+            embeddings: Dictionary of cache key to embedding
+        """
+        if self.memory:
+            self.memory.set_many({(self.model, text_hash): embedding for text_hash, embedding in embeddings.items()})
+
+        items = list(embeddings.items())
+        batch_size = settings.INGEST_BULK_BATCH_SIZE
+
+        try:
+            with transaction.atomic(), connection.cursor() as cursor:
+                for start in range(0, len(items), batch_size):
+                    batch = items[start:start + batch_size]
+                    placeholders = ', '.join(['(%s, %s::halfvec, %s)'] * len(batch))
+                    params = []
+                    for text_hash, embedding in batch:
+                        params.extend([text_hash, format_vector(embedding), self.model])
+
+                    cursor.execute(f"""
+                        INSERT INTO embedding_cache (text_hash, embedding, model)
+                        VALUES {placeholders}
+                        ON CONFLICT (text_hash, model) DO NOTHING
+                    """, params)
+
+        except Exception as e:
+            logger.warning(f"Embedding cache update failed: {str(e)}")
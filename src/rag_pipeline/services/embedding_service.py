@@ -1,18 +1,151 @@
+import asyncio
+import functools
+import inspect
 import logging
+import random
+import time
 import openai
-from typing import List
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from asgiref.sync import sync_to_async
+from typing import Dict, List, Optional, Tuple
 from django.conf import settings
+from .embedding_cache import EmbeddingCache
+from ..utils.loop_local import LoopLocal
+from ..utils.rate_limiter import RateLimiter
+from ..utils.vector_format import format_vector, normalize_vector
 
 logger = logging.getLogger(__name__)
 
+# Maximum in-flight embedding requests per OpenAI usage tier
+USAGE_TIER_CONCURRENCY = {
+    'free': 1,
+    'tier1': 35,
+    'tier2': 60,
+    'tier3': 60,
+    'tier4': 125,
+    'tier5': 125,
+}
+
+# Transient OpenAI errors worth retrying; anything else is raised immediately
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+def _parse_retry_after(error: Exception) -> float:
+    """Read the server-requested delay (in seconds) from a rate limit response."""
+    response = getattr(error, 'response', None)
+    if response is None:
+        return 0.0
+
+    headers = response.headers
+    try:
+        if headers.get('retry-after-ms'):
+            return float(headers['retry-after-ms']) / 1000.0
+        if headers.get('retry-after'):
+            return float(headers['retry-after'])
+    except ValueError:
+        pass
+
+    return 0.0
+
+
+def _backoff_wait(error: Exception, attempt: int, attempts: int, delay: float) -> float:
+    """Return (and log) how long to wait before retrying a failed attempt."""
+    wait = delay * 2 ** attempt
+    if isinstance(error, openai.RateLimitError):
+        wait = max(_parse_retry_after(error), wait)
+        logger.warning(f"OpenAI rate limit hit, retrying in {wait:.1f}s (attempt {attempt + 1}/{attempts})")
+    else:
+        logger.warning(f"OpenAI request failed: {str(error)}, retrying in {wait:.1f}s (attempt {attempt + 1}/{attempts})")
+
+    return wait
+
+
+def _log_give_up(func, error: Exception, attempt: int):
+    """Log the error that ends a retried call, once per call."""
+    logger.error(f"{func.__qualname__} failed after {attempt + 1} attempt(s): {str(error)}")
+
+
+def retry_with_backoff(max_attempts: Optional[int] = None, base_delay: Optional[float] = None):
+    """
+    Retry transient OpenAI failures with exponential backoff.
+
+    The delay doubles on each failure (1s, 2s, 4s, 8s, ...). On 429 responses
+    the server's Retry-After header is honoured when it is longer. Coroutine
+    functions are retried with asyncio.sleep so the event loop keeps running.
+
+    Args:
+        max_attempts: Total attempts before giving up (defaults to OPENAI_RETRY_ATTEMPTS)
+        base_delay: Delay in seconds after the first failure (defaults to OPENAI_RETRY_DELAY)
+    """
+    def decorator(func):
+        def settings_for_call():
+            attempts = max_attempts or settings.OPENAI_RETRY_ATTEMPTS
+            delay = base_delay if base_delay is not None else settings.OPENAI_RETRY_DELAY
+            return attempts, delay
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                attempts, delay = settings_for_call()
+
+                for attempt in range(attempts):
+                    try:
+                        return await func(*args, **kwargs)
+                    except RETRYABLE_ERRORS as e:
+                        if attempt == attempts - 1:
+                            _log_give_up(func, e, attempt)
+                            raise
+                        await asyncio.sleep(_backoff_wait(e, attempt, attempts, delay))
+                    except Exception as e:
+                        _log_give_up(func, e, attempt)
+                        raise
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            attempts, delay = settings_for_call()
+
+            for attempt in range(attempts):
+                try:
+                    return func(*args, **kwargs)
+                except RETRYABLE_ERRORS as e:
+                    if attempt == attempts - 1:
+                        _log_give_up(func, e, attempt)
+                        raise
+                    time.sleep(_backoff_wait(e, attempt, attempts, delay))
+                except Exception as e:
+                    _log_give_up(func, e, attempt)
+                    raise
+
+        return wrapper
+    return decorator
+
 
 class EmbeddingService:
     """Service for generating and managing embeddings."""
 
     def __init__(self):
-        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+        # Retries are handled by retry_with_backoff rather than the SDK
+        self.client = openai.OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
+        self.aclients = LoopLocal(
+            lambda: openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0),
+            aclose=lambda client: client.close()
+        )
+        self.rate_limiter = RateLimiter(settings.OPENAI_MAX_REQUESTS_PER_MINUTE)
         self.model = "text-embedding-3-small"
         self.dimensions = 1536
+        self.cache = EmbeddingCache(self.model) if settings.EMBEDDING_CACHE_ENABLED else None
+
+    @property
+    def aclient(self) -> openai.AsyncOpenAI:
+        """AsyncOpenAI client bound to the running event loop."""
+        return self.aclients.get()
 
     def generate_embedding(self, text: str) -> List[float]:
         """
@@ -24,38 +157,207 @@ class EmbeddingService:
         Returns:
             List of embedding values
         """
-        try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=text,
-                dimensions=self.dimensions
-            )
+        return self.generate_embeddings_batch([text])[0]
 
-            return response.data[0].embedding
+    def generate_embeddings_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Generate embeddings for multiple texts in batch.
 
-        except Exception as e:
-            logger.error(f"Embedding generation failed: {str(e)}")
-            raise
+        Args:
+            texts: List of input texts to embed
+            batch_size: Texts per request (defaults to EMBEDDING_BATCH_SIZE);
+                larger lists are sent as consecutive requests
 
-    def generate_embeddings_batch(self, texts: List[str]) -> List[List[float]]:
+        Returns:
+            List of embedding lists
         """
-        Generate embeddings for multiple texts in batch.
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+
+        def embed(misses: List[str]) -> List[List[float]]:
+            embeddings = []
+            for start in range(0, len(misses), batch_size):
+                embeddings.extend(self._create_embeddings(misses[start:start + batch_size]))
+            return embeddings
+
+        return self._generate_with_cache(texts, embed)
+
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """
+        Async variant of generate_embedding.
+
+        Args:
+            text: Input text to embed
+
+        Returns:
+            List of embedding values
+        """
+        return (await self.agenerate_embeddings_batch([text]))[0]
+
+    async def agenerate_embeddings_batch(self, texts: List[str], batch_size: Optional[int] = None) -> List[List[float]]:
+        """
+        Async variant of generate_embeddings_batch using the AsyncOpenAI client.
 
         Args:
             texts: List of input texts to embed
+            batch_size: Texts per request (defaults to EMBEDDING_BATCH_SIZE);
+                larger lists are sent as consecutive requests
 
         Returns:
             List of embedding lists
         """
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+
+        async def embed(misses: List[str]) -> List[List[float]]:
+            embeddings = []
+            for start in range(0, len(misses), batch_size):
+                embeddings.extend(await self._acreate_embeddings(misses[start:start + batch_size]))
+            return embeddings
+
+        if not self.cache:
+            return await embed(texts)
+
+        text_hashes, embeddings, misses = await sync_to_async(self._lookup_cached)(texts)
+
+        if misses:
+            new_embeddings = dict(zip(misses.keys(), await embed(list(misses.values()))))
+            await sync_to_async(self.cache.set_many)(new_embeddings)
+            embeddings.update(new_embeddings)
+
+        return [embeddings[text_hash] for text_hash in text_hashes]
+
+    def generate_embeddings_concurrent(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for many texts, submitting batches concurrently.
+
+        Args:
+            texts: List of input texts to embed
+            batch_size: Texts per request (defaults to EMBEDDING_BATCH_SIZE)
+            max_concurrency: Maximum in-flight requests (defaults to the
+                limit for OPENAI_USAGE_TIER)
+
+        Returns:
+            List of embedding lists, in the same order as texts
+        """
+        return self._generate_with_cache(
+            texts,
+            lambda misses: self._create_embeddings_concurrent(misses, batch_size, max_concurrency)
+        )
+
+    def _generate_with_cache(self, texts: List[str], embed) -> List[List[float]]:
+        """Serve embeddings from the cache and call embed() only for unique misses."""
+        if not self.cache:
+            return embed(texts)
+
+        text_hashes, embeddings, misses = self._lookup_cached(texts)
+
+        if misses:
+            new_embeddings = dict(zip(misses.keys(), embed(list(misses.values()))))
+            self.cache.set_many(new_embeddings)
+            embeddings.update(new_embeddings)
+
+        return [embeddings[text_hash] for text_hash in text_hashes]
+
+    def _lookup_cached(self, texts: List[str]) -> Tuple[List[bytes], Dict[bytes, List[float]], Dict[bytes, str]]:
+        """Hash texts and split them into cached embeddings and unique misses."""
+        text_hashes = [self.cache.hash_text(text) for text in texts]
+        embeddings = self.cache.get_many(set(text_hashes))
+
+        # Identical texts (repeated boilerplate) are only embedded once
+        misses = {}
+        for text_hash, text in zip(text_hashes, texts):
+            if text_hash not in embeddings and text_hash not in misses:
+                misses[text_hash] = text
+
+        if misses:
+            logger.debug(f"Embedding cache: {len(texts) - len(misses)} hits, {len(misses)} misses")
+
+        return text_hashes, embeddings, misses
+
+    @retry_with_backoff()
+    def _create_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Call the OpenAI embeddings API for a single batch of texts."""
+        self.rate_limiter.acquire()
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            dimensions=self.dimensions
+        )
+
+        return [data.embedding for data in response.data]
+
+    @retry_with_backoff()
+    async def _acreate_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Call the OpenAI embeddings API for a single batch of texts without blocking the event loop."""
+        await self.rate_limiter.aacquire()
+        response = await self.aclient.embeddings.create(
+            model=self.model,
+            input=texts,
+            dimensions=self.dimensions
+        )
+
+        return [data.embedding for data in response.data]
+
+    def _create_embeddings_concurrent(
+        self,
+        texts: List[str],
+        batch_size: Optional[int] = None,
+        max_concurrency: Optional[int] = None
+    ) -> List[List[float]]:
+        """Split texts into batches and call the API for them concurrently."""
+        batch_size = batch_size or settings.EMBEDDING_BATCH_SIZE
+        max_concurrency = max_concurrency or self.max_concurrency()
+
+        embeddings = [None] * len(texts)
+
+        def embed_batch(batch: List[str]) -> List[List[float]]:
+            # Small jitter in the worker so batches don't hit the API in one
+            # burst, without delaying submission of the remaining batches
+            time.sleep(random.uniform(0, 0.05))
+            return self._create_embeddings(batch)
+
+        executor = ThreadPoolExecutor(max_workers=max_concurrency)
         try:
-            response = self.client.embeddings.create(
-                model=self.model,
-                input=texts,
-                dimensions=self.dimensions
-            )
+            futures = {
+                executor.submit(embed_batch, texts[start:start + batch_size]): start
+                for start in range(0, len(texts), batch_size)
+            }
+
+            for future in as_completed(futures):
+                start = futures[future]
+                for offset, embedding in enumerate(future.result()):
+                    embeddings[start + offset] = embedding
+        finally:
+            # If a batch failed for good, drop the queued ones instead of
+            # running each against the failing API with full retries
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        return embeddings
+
+    @staticmethod
+    def format_for_pgvector(embedding: List[float]) -> str:
+        """
+        Format an embedding as a normalized pgvector text literal.
 
-            return [data.embedding for data in response.data]
+        All SQL and COPY paths go through this so the wire format stays in one
+        place. Vectors are L2-normalized so retrieval can rank by inner product.
+
+        Args:
+            embedding: Embedding values (list or numpy array)
+
+        Returns:
+            pgvector text representation ('[v1,v2,...]')
+        """
+        return format_vector(normalize_vector(embedding))
 
-        except Exception as e:
-            logger.error(f"Batch embedding generation failed: {str(e)}")
-            raise
+    @staticmethod
+    def max_concurrency() -> int:
+        """Maximum concurrent embedding requests for the configured usage tier."""
+        tier = settings.OPENAI_USAGE_TIER.lower()
+        if tier not in USAGE_TIER_CONCURRENCY:
+            logger.warning(f"Unknown OPENAI_USAGE_TIER '{tier}', falling back to free tier limits")
+        return USAGE_TIER_CONCURRENCY.get(tier, 1)
@@ -1,7 +1,8 @@
 import logging
-import requests
+import httpx
 from typing import List, Dict
 from django.conf import settings
+from ..utils.loop_local import LoopLocal, async_to_sync_closing
 
 logger = logging.getLogger(__name__)
 
@@ -12,17 +13,46 @@ class LLMService:
     def __init__(self):
         self.ollama_base_url = settings.OLLAMA_BASE_URL
         self.ollama_model = settings.OLLAMA_MODEL
-        self.openai_client = None
+        self.async_openai_clients = None
+        self.async_http_clients = LoopLocal(
+            lambda: httpx.AsyncClient(timeout=30),
+            aclose=lambda client: client.aclose()
+        )
 
         # Initialize OpenAI client as fallback
         if settings.OPENAI_API_KEY:
             import openai
-            self.openai_client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
+            self.async_openai_clients = LoopLocal(
+                lambda: openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY),
+                aclose=lambda client: client.close()
+            )
+
+    @property
+    def async_openai_client(self):
+        """AsyncOpenAI client bound to the running event loop, if OpenAI is configured."""
+        if self.async_openai_clients is None:
+            return None
+        return self.async_openai_clients.get()
 
     def generate_answer(self, query: str, chunks: List[Dict]) -> str:
         """
         Generate answer using LLM based on query and relevant chunks.
 
+        Synchronous entry point; runs agenerate_answer on its own event loop.
+
+        Args:
+            query: User query
+            chunks: List of relevant document chunks
+
+        Returns:
+            Generated answer string
+        """
+        return async_to_sync_closing(self.agenerate_answer)(query, chunks)
+
+    async def agenerate_answer(self, query: str, chunks: List[Dict]) -> str:
+        """
+        Async variant of generate_answer.
+
         Args:
             query: User query
             chunks: List of relevant document chunks
@@ -32,13 +62,13 @@ class LLMService:
         """
         try:
             # Try Ollama first
-            answer = self._generate_with_ollama(query, chunks)
+            answer = await self._agenerate_with_ollama(query, chunks)
             if answer:
                 return answer
 
             # Fallback to OpenAI if Ollama fails
-            if self.openai_client:
-                return self._generate_with_openai(query, chunks)
+            if self.async_openai_client:
+                return await self._agenerate_with_openai(query, chunks)
 
             # If both fail, return a basic response
             return self._generate_basic_response(query, chunks)
@@ -47,33 +77,14 @@ class LLMService:
             logger.error(f"LLM answer generation failed: {str(e)}")
             return self._generate_basic_response(query, chunks)
 
-    def _generate_with_ollama(self, query: str, chunks: List[Dict]) -> str:
-        """Generate answer using Ollama."""
+    async def _agenerate_with_ollama(self, query: str, chunks: List[Dict]) -> str:
+        """Generate answer using Ollama without blocking the event loop."""
         try:
-            # Prepare context from chunks
-            context = self._prepare_context(chunks)
-
-            # Create prompt
-            prompt = f"""You are a financial analyst assistant. Answer the following question based on the provided context from Apple's 10-K filings.
-
-Context:
-{context}
-
-Question: {query}
+            prompt = self._build_prompt(query, chunks)
 
-Please provide a clear, accurate answer based on the context. If the information is not available in the context, say so clearly.
-
-Answer:"""
-
-            # Make request to Ollama
-            response = requests.post(
+            response = await self.async_http_clients.get().post(
                 f"{self.ollama_base_url}/api/generate",
-                json={
-                    "model": self.ollama_model,
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
+                json=self._ollama_request(prompt)
             )
 
             if response.status_code == 200:
@@ -86,12 +97,25 @@ Answer:"""
             logger.warning(f"Ollama generation failed: {str(e)}")
             return ""
 
-    def _generate_with_openai(self, query: str, chunks: List[Dict]) -> str:
-        """Generate answer using OpenAI as fallback."""
+    async def _agenerate_with_openai(self, query: str, chunks: List[Dict]) -> str:
+        """Generate answer using OpenAI as fallback without blocking the event loop."""
         try:
-            context = self._prepare_context(chunks)
+            prompt = self._build_prompt(query, chunks)
+
+            response = await self.async_openai_client.chat.completions.create(**self._openai_request(prompt))
 
-            prompt = f"""You are a financial analyst assistant. Answer the following question based on the provided context from Apple's 10-K filings.
+            return response.choices[0].message.content.strip()
+
+        except Exception as e:
+            logger.error(f"OpenAI generation failed: {str(e)}")
+            return ""
+
+    def _build_prompt(self, query: str, chunks: List[Dict]) -> str:
+        """Build the answer prompt from the query and chunk context."""
+        # Prepare context from chunks
+        context = self._prepare_context(chunks)
+
+        return f"""You are a financial analyst assistant. Answer the following question based on the provided context from Apple's 10-K filings.
 
 Context:
 {context}
@@ -102,21 +126,25 @@ Please provide a clear, accurate answer based on the context. If the information
 
 Answer:"""
 
-            response = self.openai_client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "You are a helpful financial analyst assistant."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=500,
-                temperature=0.1
-            )
-
-            return response.choices[0].message.content.strip()
-
-        except Exception as e:
-            logger.error(f"OpenAI generation failed: {str(e)}")
-            return ""
+    def _ollama_request(self, prompt: str) -> Dict:
+        """Request body for the Ollama generate API."""
+        return {
+            "model": self.ollama_model,
+            "prompt": prompt,
+            "stream": False
+        }
+
+    def _openai_request(self, prompt: str) -> Dict:
+        """Keyword arguments for the OpenAI chat completions API."""
+        return {
+            "model": "gpt-3.5-turbo",
+            "messages": [
+                {"role": "system", "content": "You are a helpful financial analyst assistant."},
+                {"role": "user", "content": prompt}
+            ],
+            "max_tokens": 500,
+            "temperature": 0.1
+        }
 
     def _generate_basic_response(self, query: str, chunks: List[Dict]) -> str:
         """Generate a basic response when LLM services fail."""
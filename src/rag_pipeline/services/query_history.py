@@ -0,0 +1,46 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# Single background writer so history inserts stay off the request path
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='query-history')
+
+
+def record_query(**fields):
+    """
+    Record a QueryHistory row without blocking the caller.
+
+    The insert is queued once the current transaction commits (immediately
+    in autocommit mode) and performed by a background thread. Set
+    QUERY_HISTORY_ASYNC=False to write inline.
+
+    Args:
+        **fields: QueryHistory field values
+    """
+    if not settings.QUERY_HISTORY_ASYNC:
+        _save(fields)
+        return
+
+    transaction.on_commit(lambda: _executor.submit(_write, fields))
+
+
+def _write(fields: dict):
+    """Save a history row on the writer thread, managing its connection like a request would."""
+    close_old_connections()
+    try:
+        _save(fields)
+    finally:
+        close_old_connections()
+
+
+def _save(fields: dict):
+    """Insert a QueryHistory row; failures are logged, never raised."""
+    from ..models import QueryHistory
+
+    try:
+        QueryHistory.objects.create(**fields)
+    except Exception as e:
+        logger.warning(f"Failed to record query history: {str(e)}")
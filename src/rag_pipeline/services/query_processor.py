@@ -1,8 +1,19 @@
+import asyncio
 import logging
+import numpy as np
+import psycopg
+import tiktoken
+from asgiref.sync import sync_to_async
 from typing import Dict, List, Any
-from django.db import connection
+from django.conf import settings
+from django.db import connection, transaction
 from .embedding_service import EmbeddingService
 from .llm_service import LLMService
+from ..utils.hnsw import EF_SEARCH_MAX, ef_search_for_top_k
+from ..utils.loop_local import async_to_sync_closing
+from ..utils.mmr import mmr_select
+from ..utils.semantic_cache import get_retrieval_cache, get_semantic_cache
+from ..utils.vector_types import register_vector_types
 
 logger = logging.getLogger(__name__)
 
@@ -13,11 +24,33 @@ class QueryProcessor:
     def __init__(self):
         self.embedding_service = EmbeddingService()
         self.llm_service = LLMService()
+        self.encoding = tiktoken.get_encoding("cl100k_base")
 
     def process_query(self, query: str, year: int, top_k: int = 5) -> Dict[str, Any]:
         """
         Process a query through the RAG pipeline.
 
+        Synchronous entry point; runs aprocess_query on its own event loop.
+
+        Args:
+            query: User query string
+            year: Year to filter documents
+            top_k: Number of top chunks to retrieve
+
+        Returns:
+            Dictionary with answer, sources, and metadata
+        """
+        return async_to_sync_closing(self.aprocess_query)(query, year, top_k)
+
+    async def aprocess_query(self, query: str, year: int, top_k: int = 5) -> Dict[str, Any]:
+        """
+        Process a query through the RAG pipeline.
+
+        Embedding and answer generation use async clients; the vector search
+        runs through sync_to_async. When chunks retrieved for a similar recent
+        query are cached, answer generation starts from them concurrently with
+        the search and is kept if the search returns the same chunks.
+
         Args:
             query: User query string
             year: Year to filter documents
@@ -28,65 +61,104 @@ class QueryProcessor:
         """
         try:
             # Generate query embedding
-            query_embedding = self.embedding_service.generate_embedding(query)
+            query_embedding = await self.embedding_service.agenerate_embedding(self._truncate_for_embedding(query))
+
+            # Reuse the result of a near-identical recent query
+            semantic_cache = get_semantic_cache()
+            if semantic_cache:
+                cached_result = semantic_cache.get(query_embedding, year, top_k)
+                if cached_result is not None:
+                    return cached_result
 
-            # Retrieve relevant chunks
-            relevant_chunks = self._retrieve_chunks(query_embedding, year, top_k)
+            # If a similar recent query's chunks are cached, start answering
+            # from them while the authoritative search runs
+            retrieval_cache = get_retrieval_cache()
+            speculative = retrieval_cache.get(query_embedding, year, top_k) if retrieval_cache else None
+            speculative_answer = None
+            if speculative:
+                speculative_answer = asyncio.create_task(
+                    self.llm_service.agenerate_answer(query, speculative['chunks'])
+                )
 
-            if not relevant_chunks:
-                return {
-                    'answer': 'No relevant information found for your query.',
-                    'sources': [],
-                    'confidence': 0.0
-                }
+            try:
+                # Retrieve relevant chunks
+                relevant_chunks = await sync_to_async(self._retrieve_chunks)(query_embedding, year, top_k)
 
-            # Generate answer using LLM
-            answer = self.llm_service.generate_answer(query, relevant_chunks)
+                if not relevant_chunks:
+                    return {
+                        'answer': 'No relevant information found for your query.',
+                        'sources': [],
+                        'confidence': 0.0
+                    }
 
-            # Calculate confidence based on relevance scores
-            confidence = self._calculate_confidence(relevant_chunks)
+                if retrieval_cache:
+                    retrieval_cache.set(query_embedding, year, top_k, {'chunks': relevant_chunks})
 
-            # Format sources
-            sources = self._format_sources(relevant_chunks)
+                # Keep the speculative answer only if it was built from the same
+                # chunks, in the same order; otherwise restart with the real ones
+                if speculative_answer and self._chunk_ids(speculative['chunks']) == self._chunk_ids(relevant_chunks):
+                    answer = await speculative_answer
+                else:
+                    if speculative_answer:
+                        speculative_answer.cancel()
 
-            return {
+                    # Generate answer using LLM
+                    answer = await self.llm_service.agenerate_answer(query, relevant_chunks)
+            finally:
+                if speculative_answer and not speculative_answer.done():
+                    speculative_answer.cancel()
+
+            result = {
                 'answer': answer,
-                'sources': sources,
-                'confidence': confidence
+                'sources': self._format_sources(relevant_chunks),
+                'confidence': self._calculate_confidence(relevant_chunks)
             }
 
+            if semantic_cache:
+                semantic_cache.set(query_embedding, year, top_k, result)
+
+            return result
+
         except Exception as e:
             logger.error(f"Query processing failed: {str(e)}")
             raise
 
+    def _truncate_for_embedding(self, query: str) -> str:
+        """Cap the text sent to the embedding model at QUERY_MAX_EMBEDDING_TOKENS."""
+        max_tokens = settings.QUERY_MAX_EMBEDDING_TOKENS
+
+        # Every token covers at least one character, so short queries can't exceed the cap
+        if len(query) <= max_tokens:
+            return query
+
+        tokens = self.encoding.encode(query)
+        if len(tokens) <= max_tokens:
+            return query
+
+        return self.encoding.decode(tokens[:max_tokens])
+
     def _retrieve_chunks(self, query_embedding: List[float], year: int, top_k: int) -> List[Dict]:
         """Retrieve most relevant chunks using vector similarity search."""
+        # With MMR, over-fetch candidates (with their embeddings) and rerank
+        use_mmr = settings.RETRIEVAL_MMR_ENABLED
+        limit = top_k * settings.RETRIEVAL_MMR_CANDIDATE_FACTOR if use_mmr else top_k
+
         try:
-            with connection.cursor() as cursor:
-                # Convert embedding to PostgreSQL array format
-                embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
-
-                # Query for similar chunks using cosine similarity
-                query = """
-                SELECT
-                    c.id,
-                    c.chunk_text,
-                    c.section,
-                    c.subsection,
-                    d.company,
-                    d.year,
-                    d.filing_date,
-                    1 - (e.embedding <=> %s::vector) as similarity_score
-                FROM chunks c
-                JOIN documents d ON c.document_id = d.id
-                JOIN embeddings e ON c.id = e.chunk_id
-                WHERE d.year = %s
-                ORDER BY e.embedding <=> %s::vector
-                LIMIT %s
-                """
-
-                cursor.execute(query, [embedding_str, year, embedding_str, top_k])
-                results = cursor.fetchall()
+            with transaction.atomic(), connection.cursor() as cursor:
+                # Convert embedding to pgvector text format
+                embedding_str = self.embedding_service.format_for_pgvector(query_embedding)
+
+                # A weak first match re-runs the scan with the wider ef_search
+                # inside search_year_embeddings, in the same round trip
+                ef_search = ef_search_for_top_k(limit)
+                deep_ef_search = min(EF_SEARCH_MAX, settings.RETRIEVAL_DEEPEN_EF_SEARCH)
+                results = self._search_embeddings(cursor, embedding_str, year, limit, ef_search, deep_ef_search, use_mmr)
+
+                if use_mmr and len(results) > top_k:
+                    scores = np.asarray([row[7] for row in results], dtype=np.float32)
+                    embeddings = np.stack([row[8].to_numpy() for row in results])
+                    selected = mmr_select(scores, embeddings, top_k, settings.RETRIEVAL_MMR_LAMBDA)
+                    results = [results[index] for index in selected]
 
                 chunks = []
                 for row in results:
@@ -107,13 +179,65 @@ class QueryProcessor:
             logger.error(f"Chunk retrieval failed: {str(e)}")
             raise
 
+    def _search_embeddings(
+        self,
+        cursor,
+        embedding_str: str,
+        year: int,
+        limit: int,
+        ef_search: int,
+        deep_ef_search: int,
+        include_embeddings: bool
+    ) -> List[tuple]:
+        """Run the nearest-neighbour query, deepening hnsw.ef_search on a weak best match."""
+        # search_year_embeddings scans that year's partial HNSW index by inner
+        # product, which equals cosine similarity for the normalized stored
+        # and query vectors, and sets hnsw.ef_search for this transaction only
+        query = f"""
+        SELECT
+            c.id,
+            c.chunk_text,
+            c.section,
+            c.subsection,
+            d.company,
+            d.year,
+            d.filing_date,
+            s.similarity_score
+            {', s.embedding' if include_embeddings else ''}
+        FROM search_year_embeddings(%s::halfvec, %s::integer, %s::integer, %s::integer, %s::integer, %s::double precision) s
+        JOIN chunks c ON c.id = s.chunk_id
+        JOIN documents d ON c.document_id = d.id
+        ORDER BY s.similarity_score DESC
+        """
+
+        params = [embedding_str, year, limit, ef_search, deep_ef_search, settings.RETRIEVAL_DEEPEN_THRESHOLD]
+        if not include_embeddings:
+            cursor.execute(query, params)
+            return cursor.fetchall()
+
+        # Django's cursors bind parameters client-side, which only supports
+        # text results; fetch candidate embeddings through a server-side
+        # binding cursor in binary so halfvec values are decoded from the
+        # wire bytes instead of parsed from text
+        raw_connection = connection.connection
+        register_vector_types(raw_connection)
+        with psycopg.Cursor(raw_connection) as binary_cursor:
+            binary_cursor.execute(query, params, binary=True)
+            return binary_cursor.fetchall()
+
+    @staticmethod
+    def _chunk_ids(chunks: List[Dict]) -> List[str]:
+        """Return the ids of chunks in ranking order."""
+        return [chunk['chunk_id'] for chunk in chunks]
+
     def _calculate_confidence(self, chunks: List[Dict]) -> float:
         """Calculate confidence score based on similarity scores."""
         if not chunks:
             return 0.0
 
         # Use the highest similarity score as base confidence
-        max_similarity = max(chunk['similarity_score'] for chunk in chunks)
+        scores = np.fromiter((chunk['similarity_score'] for chunk in chunks), dtype=np.float64, count=len(chunks))
+        max_similarity = float(scores.max())
 
         # Adjust based on number of relevant chunks
         chunk_factor = min(len(chunks) / 3.0, 1.0)  # Cap at 1.0 for 3+ chunks
@@ -2,9 +2,26 @@ import tiktoken
 import logging
 from typing import List, Dict
 import re
+from .keyword_matcher import KeywordMatcher
+
+try:
+    # Optional native (Rust) splitter, installed with the "fast" extra
+    from semantic_text_splitter import TextSplitter
+except ImportError:
+    TextSplitter = None
 
 logger = logging.getLogger(__name__)
 
+_SENTENCE_SPLIT = re.compile(r'(?<=[.!?])\s+')
+
+# Section keywords in priority order; the first section with a match wins
+_SECTION_MATCHER = KeywordMatcher({
+    'MD&A': ['management discussion', 'md&a', 'operating results'],
+    'Financial Statements': ['consolidated statements', 'balance sheet', 'income statement', 'cash flow'],
+    'Risk Factors': ['risk factors', 'risks and uncertainties'],
+    'Business Overview': ['business overview', 'products and services', 'market'],
+})
+
 
 class TextChunker:
     """Service for chunking text into manageable pieces."""
@@ -14,6 +31,12 @@ class TextChunker:
         self.overlap = overlap
         self.encoding = tiktoken.get_encoding("cl100k_base")
 
+        # Prefer the native splitter when available; it tokenizes and splits
+        # in Rust using the same cl100k_base encoding as the embedding model
+        self.splitter = None
+        if TextSplitter is not None:
+            self.splitter = TextSplitter.from_tiktoken_model("text-embedding-3-small", chunk_size, overlap=overlap)
+
     def chunk_text(self, text: str) -> List[Dict]:
         """
         Chunk text into overlapping pieces.
@@ -25,19 +48,24 @@ class TextChunker:
             List of chunk dictionaries with text and metadata
         """
         try:
-            # Split text into sentences
+            if self.splitter is not None:
+                return self._chunk_with_splitter(text)
+
+            # Split text into sentences and tokenize them in one batch
             sentences = self._split_into_sentences(text)
+            sentence_token_counts = [len(tokens) for tokens in self.encoding.encode_batch(sentences)]
 
+            # The current chunk is always the contiguous run sentences[start:i];
+            # its token count is kept as a running total, so closing a chunk
+            # only subtracts the sentences dropped from its front
             chunks = []
-            current_chunk = []
+            start = 0
             current_tokens = 0
 
-            for sentence in sentences:
-                sentence_tokens = len(self.encoding.encode(sentence))
-
+            for i, sentence_tokens in enumerate(sentence_token_counts):
                 # If adding this sentence would exceed chunk size, finalize current chunk
-                if current_tokens + sentence_tokens > self.chunk_size and current_chunk:
-                    chunk_text = ' '.join(current_chunk)
+                if current_tokens + sentence_tokens > self.chunk_size and i > start:
+                    chunk_text = ' '.join(sentences[start:i])
                     chunks.append({
                         'text': chunk_text,
                         'token_count': current_tokens,
@@ -45,15 +73,15 @@ class TextChunker:
                     })
 
                     # Start new chunk with overlap
-                    current_chunk = self._get_overlap_chunk(current_chunk)
-                    current_tokens = sum(len(self.encoding.encode(s)) for s in current_chunk)
+                    overlap_start = self._get_overlap_start(start, i)
+                    current_tokens -= sum(sentence_token_counts[start:overlap_start])
+                    start = overlap_start
 
-                current_chunk.append(sentence)
                 current_tokens += sentence_tokens
 
             # Add final chunk if it has content
-            if current_chunk:
-                chunk_text = ' '.join(current_chunk)
+            if start < len(sentences):
+                chunk_text = ' '.join(sentences[start:])
                 chunks.append({
                     'text': chunk_text,
                     'token_count': current_tokens,
@@ -66,39 +94,34 @@ class TextChunker:
             logger.error(f"Text chunking failed: {str(e)}")
             return [{'text': text, 'token_count': 0, 'section': 'Unknown'}]
 
+    def _chunk_with_splitter(self, text: str) -> List[Dict]:
+        """Chunk text with the native splitter."""
+        chunk_texts = self.splitter.chunks(text)
+        token_counts = [len(tokens) for tokens in self.encoding.encode_batch(chunk_texts)]
+
+        return [
+            {
+                'text': chunk_text,
+                'token_count': token_count,
+                'section': self._detect_section(chunk_text)
+            }
+            for chunk_text, token_count in zip(chunk_texts, token_counts)
+        ]
+
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences."""
         # Simple sentence splitting - can be improved with more sophisticated NLP
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENTENCE_SPLIT.split(text)
         return [s.strip() for s in sentences if s.strip()]
 
-    def _get_overlap_chunk(self, previous_chunk: List[str]) -> List[str]:
-        """Get overlap portion from previous chunk."""
-        if len(previous_chunk) <= 2:
-            return []
+    def _get_overlap_start(self, start: int, end: int) -> int:
+        """Get the first sentence index of the overlap carried over from sentences[start:end]."""
+        if end - start <= 2:
+            return end
 
-        # Take last 2-3 sentences for overlap
-        overlap_sentences = previous_chunk[-2:]
-        return overlap_sentences
+        # Take last 2 sentences for overlap
+        return end - 2
 
     def _detect_section(self, text: str) -> str:
         """Detect which section of the 10-K this chunk belongs to."""
-        text_lower = text.lower()
-
-        # Management Discussion & Analysis
-        if any(keyword in text_lower for keyword in ['management discussion', 'md&a', 'operating results']):
-            return 'MD&A'
-
-        # Financial Statements
-        if any(keyword in text_lower for keyword in ['consolidated statements', 'balance sheet', 'income statement', 'cash flow']):
-            return 'Financial Statements'
-
-        # Risk Factors
-        if any(keyword in text_lower for keyword in ['risk factors', 'risks and uncertainties']):
-            return 'Risk Factors'
-
-        # Business Overview
-        if any(keyword in text_lower for keyword in ['business overview', 'products and services', 'market']):
-            return 'Business Overview'
-
-        return 'Other'
+        return _SECTION_MATCHER.first_label(text) or 'Other'
@@ -0,0 +1,193 @@
+import logging
+from typing import Dict
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+# SystemConfig key holding the hnsw.ef_search value used at query time
+EF_SEARCH_CONFIG_KEY = 'hnsw_ef_search'
+EF_SEARCH_CACHE_KEY = 'rag_pipeline:hnsw_ef_search'
+
+# hnsw.ef_search bounds enforced by pgvector; the scan returns at most
+# ef_search rows, so it is kept at a multiple of the requested top_k
+EF_SEARCH_MAX = 1000
+EF_SEARCH_TOP_K_FACTOR = 4
+
+
+def configure_hnsw_params(vector_count: int) -> Dict[str, int]:
+    """
+    Choose HNSW build and search parameters for the number of stored vectors.
+
+    Larger graphs need more links per node (m) and a wider candidate list
+    (ef_construction / ef_search) to keep recall up. Explicit HNSW_M,
+    HNSW_EF_CONSTRUCTION and HNSW_EF_SEARCH settings take precedence.
+
+    Args:
+        vector_count: Number of vectors to index
+
+    Returns:
+        Dictionary with m, ef_construction and ef_search
+    """
+    if vector_count < 100_000:
+        params = {'m': 16, 'ef_construction': 64, 'ef_search': 40}
+    elif vector_count < 1_000_000:
+        params = {'m': 24, 'ef_construction': 100, 'ef_search': 100}
+    else:
+        params = {'m': 32, 'ef_construction': 128, 'ef_search': 200}
+
+    for key, setting_name in [
+        ('m', 'HNSW_M'),
+        ('ef_construction', 'HNSW_EF_CONSTRUCTION'),
+        ('ef_search', 'HNSW_EF_SEARCH'),
+    ]:
+        override = getattr(settings, setting_name, 0)
+        if override:
+            params[key] = override
+
+    return params
+
+
+def year_index_name(year: int) -> str:
+    """Return the name of the partial HNSW index covering one filing year."""
+    return f'embeddings_{int(year)}_hnsw'
+
+
+def create_year_index(cursor, year: int, rebuild: bool = False) -> Dict[str, int]:
+    """
+    Create the partial HNSW index over one year's embeddings.
+
+    Queries always filter on a single year, so each year gets its own
+    smaller graph (WHERE year = <year>) sized for that year's vectors.
+
+    Args:
+        cursor: Database cursor
+        year: Filing year to index
+        rebuild: Drop and rebuild the index if it already exists
+
+    Returns:
+        HNSW parameters used for the index
+    """
+    year = int(year)
+    index_name = year_index_name(year)
+
+    cursor.execute("SELECT COUNT(*) FROM embeddings WHERE year = %s;", [year])
+    params = configure_hnsw_params(cursor.fetchone()[0])
+
+    if rebuild:
+        cursor.execute(f"DROP INDEX IF EXISTS {index_name};")
+
+    # Give the index build more memory and parallel workers
+    cursor.execute("SET maintenance_work_mem = %s;", [settings.HNSW_MAINTENANCE_WORK_MEM])
+    cursor.execute("SET max_parallel_maintenance_workers = %s;", [settings.HNSW_MAX_PARALLEL_WORKERS])
+
+    try:
+        # Stored embeddings are unit length, so inner product ranks like
+        # cosine without the per-comparison norm computation. The predicate
+        # must be a literal for the planner to match it
+        cursor.execute(f"""
+            CREATE INDEX IF NOT EXISTS {index_name} ON embeddings USING hnsw (embedding halfvec_ip_ops)
+            WITH (m = %s, ef_construction = %s) WHERE year = {year};
+        """, [params['m'], params['ef_construction']])
+    finally:
+        cursor.execute("RESET maintenance_work_mem;")
+        cursor.execute("RESET max_parallel_maintenance_workers;")
+
+    return params
+
+
+# Nearest-neighbour search over one year's embeddings with an adaptive
+# second pass: both HNSW scans run server-side, so a weak first match costs
+# another index scan but no extra round trip. The scan is built with
+# format() so the year is a literal the planner can match against the
+# partial per-year index; EXECUTE plans it afresh on each call.
+SEARCH_FUNCTION_SQL = """
+    CREATE OR REPLACE FUNCTION search_year_embeddings(
+        query_embedding halfvec,
+        search_year integer,
+        match_limit integer,
+        ef_search integer,
+        deep_ef_search integer,
+        deepen_threshold double precision
+    )
+    RETURNS TABLE (chunk_id uuid, similarity_score double precision, embedding halfvec)
+    LANGUAGE plpgsql
+    AS $$
+    DECLARE
+        scan text := format(
+            'SELECT array_agg(chunk_id ORDER BY similarity_score DESC), '
+            '       array_agg(similarity_score ORDER BY similarity_score DESC), '
+            '       array_agg(embedding ORDER BY similarity_score DESC) '
+            'FROM ('
+            '    SELECT e.chunk_id, ((e.embedding <#> $1) * -1)::double precision AS similarity_score, e.embedding '
+            '    FROM embeddings e WHERE e.year = %s '
+            '    ORDER BY e.embedding <#> $1 LIMIT $2'
+            ') matches',
+            search_year
+        );
+        chunk_ids uuid[];
+        scores double precision[];
+        embeddings halfvec[];
+    BEGIN
+        PERFORM set_config('hnsw.ef_search', ef_search::text, true);
+        EXECUTE scan INTO chunk_ids, scores, embeddings USING query_embedding, match_limit;
+
+        -- scores[1] is the best match; NULL (no rows) never deepens
+        IF deep_ef_search > ef_search AND scores[1] < deepen_threshold THEN
+            PERFORM set_config('hnsw.ef_search', deep_ef_search::text, true);
+            EXECUTE scan INTO chunk_ids, scores, embeddings USING query_embedding, match_limit;
+        END IF;
+
+        RETURN QUERY SELECT * FROM unnest(chunk_ids, scores, embeddings);
+    END;
+    $$;
+"""
+
+
+def create_search_function(cursor):
+    """Create (or replace) the search_year_embeddings SQL function."""
+    cursor.execute(SEARCH_FUNCTION_SQL)
+
+
+def get_ef_search() -> int:
+    """Return the hnsw.ef_search value stored in SystemConfig (cached)."""
+    def load():
+        from ..models import SystemConfig
+
+        try:
+            return int(SystemConfig.objects.get(key=EF_SEARCH_CONFIG_KEY).value)
+        except SystemConfig.DoesNotExist:
+            pass
+        except Exception as e:
+            logger.warning(f"Failed to load {EF_SEARCH_CONFIG_KEY} from SystemConfig: {str(e)}")
+
+        return settings.HNSW_EF_SEARCH or 40
+
+    return cache.get_or_set(EF_SEARCH_CACHE_KEY, load, 300)
+
+
+def ef_search_for_top_k(top_k: int) -> int:
+    """
+    Return the hnsw.ef_search to use for a query returning top_k rows.
+
+    Args:
+        top_k: Number of nearest neighbours requested
+
+    Returns:
+        Configured ef_search, raised to top_k * EF_SEARCH_TOP_K_FACTOR
+    """
+    return min(EF_SEARCH_MAX, max(get_ef_search(), top_k * EF_SEARCH_TOP_K_FACTOR))
+
+
+def set_ef_search(ef_search: int):
+    """Persist the hnsw.ef_search value used by the retrieval path."""
+    from ..models import SystemConfig
+
+    SystemConfig.objects.update_or_create(
+        key=EF_SEARCH_CONFIG_KEY,
+        defaults={
+            'value': str(ef_search),
+            'description': 'HNSW ef_search used for vector similarity queries',
+        }
+    )
+    cache.delete(EF_SEARCH_CACHE_KEY)
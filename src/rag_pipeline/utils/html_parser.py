@@ -1,91 +1,98 @@
 import logging
 import re
-from bs4 import BeautifulSoup
-from typing import Dict, List
+from selectolax.lexbor import LexborHTMLParser, LexborNode
+from collections import defaultdict
+from typing import Dict, List, Union
+from .keyword_matcher import KeywordMatcher
 
 logger = logging.getLogger(__name__)
 
+# Keywords used to locate each 10-K section, in priority order
+SECTION_KEYWORDS = {
+    'md&a': ['management discussion', 'md&a', 'operating results', 'financial condition'],
+    'financial_statements': ['consolidated statements', 'balance sheet', 'income statement', 'cash flow'],
+    'risk_factors': ['risk factors', 'risks and uncertainties', 'risk management'],
+    'business_overview': ['business overview', 'products and services', 'market', 'competition'],
+}
+
+# One automaton finds every section keyword in a single pass over the document
+_SECTION_MATCHER = KeywordMatcher(SECTION_KEYWORDS)
+_COMPANY_RE = re.compile(r'apple', re.IGNORECASE | re.ASCII)
+_DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}', re.ASCII)
+
+TEXT_NODE = '-text'
+SECTION_PARENT_TAGS = {'div', 'p', 'section', 'article'}
+SECTION_SIBLING_TAGS = {'div', 'p', 'section'}
+
 
 class HTMLParser:
     """Service for parsing 10-K HTML documents."""
 
-    def parse_10k(self, html_content: str) -> Dict[str, any]:
+    def parse_10k(self, html_content: Union[str, bytes]) -> Dict[str, any]:
         """
         Parse 10-K HTML content and extract relevant sections.
 
         Args:
-            html_content: Raw HTML content
+            html_content: Raw HTML content; bytes are decoded using the
+                charset declared in the document
 
         Returns:
             Dictionary with parsed content and sections
         """
         try:
-            soup = BeautifulSoup(html_content, 'html.parser')
+            tree = LexborHTMLParser(html_content, encoding=True)
 
             # Remove script and style elements
-            for script in soup(["script", "style"]):
-                script.decompose()
+            tree.strip_tags(['script', 'style'])
 
             # Extract sections
-            sections = self._extract_sections(soup)
+            sections = self._extract_sections(tree)
 
             # Combine all text
-            full_text = self._extract_full_text(soup)
+            full_text = self._extract_full_text(tree)
 
             return {
                 'sections': sections,
                 'full_text': full_text,
-                'metadata': self._extract_metadata(soup)
+                'metadata': self._extract_metadata(tree)
             }
 
         except Exception as e:
             logger.error(f"HTML parsing failed: {str(e)}")
+            if isinstance(html_content, bytes):
+                html_content = html_content.decode('utf-8', errors='replace')
             return {
                 'sections': {},
                 'full_text': html_content,
                 'metadata': {}
             }
 
-    def _extract_sections(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_sections(self, tree: LexborHTMLParser) -> Dict[str, str]:
         """Extract specific sections from 10-K document."""
-        sections = {}
-
-        # Management Discussion & Analysis
-        sections['md&a'] = self._extract_section_by_keywords(
-            soup,
-            ['management discussion', 'md&a', 'operating results', 'financial condition']
-        )
-
-        # Financial Statements
-        sections['financial_statements'] = self._extract_section_by_keywords(
-            soup,
-            ['consolidated statements', 'balance sheet', 'income statement', 'cash flow']
-        )
-
-        # Risk Factors
-        sections['risk_factors'] = self._extract_section_by_keywords(
-            soup,
-            ['risk factors', 'risks and uncertainties', 'risk management']
-        )
-
-        # Business Overview
-        sections['business_overview'] = self._extract_section_by_keywords(
-            soup,
-            ['business overview', 'products and services', 'market', 'competition']
-        )
-
-        return sections
-
-    def _extract_section_by_keywords(self, soup: BeautifulSoup, keywords: List[str]) -> str:
+        text_nodes = list(self._iter_text_nodes(tree))
+
+        # Text nodes containing each keyword, in document order, from one
+        # automaton pass over all node texts
+        keyword_nodes = defaultdict(list)
+        last_index = {}
+        for index, keyword in _SECTION_MATCHER.iter_segment_matches([node.text(deep=False) for node in text_nodes]):
+            if last_index.get(keyword) != index:
+                keyword_nodes[keyword].append(text_nodes[index])
+                last_index[keyword] = index
+
+        return {
+            section: self._extract_section_by_keywords(keyword_nodes, keywords)
+            for section, keywords in SECTION_KEYWORDS.items()
+        }
+
+    def _extract_section_by_keywords(self, keyword_nodes: Dict[str, List[LexborNode]], keywords: List[str]) -> str:
         """Extract section content based on keywords."""
         try:
-            # Find elements containing keywords
+            # Try keywords in priority order, matching text nodes in document order
             for keyword in keywords:
-                elements = soup.find_all(text=lambda text: text and keyword.lower() in text.lower())
-
-                for element in elements:
+                for node in keyword_nodes.get(keyword, ()):
                     # Find the parent section
-                    section = element.find_parent(['div', 'p', 'section', 'article'])
+                    section = self._find_section_parent(node)
                     if section:
                         # Extract text from this section and following siblings
                         section_text = self._extract_section_text(section)
@@ -98,61 +105,84 @@ class HTMLParser:
             logger.warning(f"Section extraction failed for keywords {keywords}: {str(e)}")
             return ""
 
-    def _extract_section_text(self, element) -> str:
+    def _find_section_parent(self, node: LexborNode):
+        """Find the closest block-level ancestor of a text node."""
+        parent = node.parent
+        while parent is not None and parent.tag not in SECTION_PARENT_TAGS:
+            parent = parent.parent
+        return parent
+
+    def _extract_section_text(self, element: LexborNode) -> str:
         """Extract text from a section element and its following siblings."""
         text_parts = []
 
         # Get text from current element
-        text_parts.append(element.get_text(strip=True))
+        text_parts.append(element.text(strip=True))
 
-        # Get text from following siblings (up to a reasonable limit)
-        current = element.find_next_sibling()
+        # Get text from following sibling elements (up to a reasonable limit)
+        current = self._next_element(element)
         count = 0
         while current and count < 10:  # Limit to prevent extracting too much
-            if current.name in ['div', 'p', 'section']:
-                text_parts.append(current.get_text(strip=True))
-            current = current.find_next_sibling()
+            if current.tag in SECTION_SIBLING_TAGS:
+                text_parts.append(current.text(strip=True))
+            current = self._next_element(current)
             count += 1
 
         return ' '.join(text_parts)
 
-    def _extract_full_text(self, soup: BeautifulSoup) -> str:
+    def _next_element(self, node: LexborNode):
+        """Return the next sibling element, skipping text nodes."""
+        current = node.next
+        while current is not None and current.tag == TEXT_NODE:
+            current = current.next
+        return current
+
+    def _extract_full_text(self, tree: LexborHTMLParser) -> str:
         """Extract all text content from the document."""
         try:
             # Remove navigation and header elements
-            for element in soup.find_all(['nav', 'header', 'footer', 'aside']):
-                element.decompose()
+            tree.strip_tags(['nav', 'header', 'footer', 'aside'])
 
             # Get main content
-            main_content = soup.find('main') or soup.find('body') or soup
+            main_content = tree.css_first('main') or tree.body or tree.root
 
-            return main_content.get_text(separator=' ', strip=True)
+            return main_content.text(separator=' ', strip=True)
 
         except Exception as e:
             logger.warning(f"Full text extraction failed: {str(e)}")
-            return soup.get_text(separator=' ', strip=True)
+            return tree.root.text(separator=' ', strip=True)
 
-    def _extract_metadata(self, soup: BeautifulSoup) -> Dict[str, str]:
+    def _extract_metadata(self, tree: LexborHTMLParser) -> Dict[str, str]:
         """Extract metadata from the document."""
         metadata = {}
 
         try:
             # Extract title
-            title = soup.find('title')
+            title = tree.css_first('title')
             if title:
-                metadata['title'] = title.get_text(strip=True)
+                metadata['title'] = title.text(strip=True)
 
             # Extract company name from various sources
-            company_elements = soup.find_all(text=lambda text: text and 'apple' in text.lower())
-            if company_elements:
+            if any(_COMPANY_RE.search(text) for text in self._iter_texts(tree)):
                 metadata['company'] = 'Apple Inc.'
 
             # Extract filing date if available
-            date_elements = soup.find_all(text=lambda text: text and re.search(r'\d{4}-\d{2}-\d{2}', text))
-            if date_elements:
-                metadata['filing_date'] = date_elements[0].strip()
+            date_text = next((text for text in self._iter_texts(tree) if _DATE_RE.search(text)), None)
+            if date_text:
+                metadata['filing_date'] = date_text.strip()
 
         except Exception as e:
             logger.warning(f"Metadata extraction failed: {str(e)}")
 
         return metadata
+
+    def _iter_text_nodes(self, tree: LexborHTMLParser):
+        """Yield every text node in document order."""
+        for node in tree.root.traverse(include_text=True):
+            if node.tag == TEXT_NODE:
+                yield node
+
+    def _iter_texts(self, tree: LexborHTMLParser):
+        """Yield the text of every text node in document order."""
+        for node in self._iter_text_nodes(tree):
+            yield node.text(deep=False)
@@ -0,0 +1,28 @@
+import threading
+import httpx
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> httpx.Client:
+    """
+    Return the process-wide HTTP client, creating it on first use.
+
+    Document fetches share one keep-alive connection pool, so repeated
+    requests to the same host skip the TCP/TLS handshake. httpx.Client is
+    safe to share across threads. Ollama generation is async and uses the
+    per-loop httpx.AsyncClient in LLMService instead.
+    """
+    global _client
+
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(
+                    http2=True,
+                    timeout=30,
+                    limits=httpx.Limits(max_keepalive_connections=20)
+                )
+
+    return _client
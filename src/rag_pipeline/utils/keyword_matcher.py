@@ -0,0 +1,94 @@
+import ahocorasick
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Joins texts scanned together; never part of a keyword, so matches cannot span texts
+SEGMENT_SEPARATOR = '\x00'
+
+
+class KeywordMatcher:
+    """
+    Case-insensitive multi-keyword matcher backed by an Aho-Corasick automaton.
+
+    All keywords are found in a single pass over the text instead of one
+    substring scan per keyword.
+    """
+
+    def __init__(self, keywords: Dict[str, List[str]]):
+        """
+        Build the automaton.
+
+        Args:
+            keywords: Keywords per label; label order is match priority
+        """
+        self.automaton = ahocorasick.Automaton()
+        self.priorities = {label: priority for priority, label in enumerate(keywords)}
+
+        # Lowercased keyword -> (original keyword, labels it belongs to)
+        entries = {}
+        for label, label_keywords in keywords.items():
+            for keyword in label_keywords:
+                entries.setdefault(keyword.lower(), (keyword, []))[1].append(label)
+
+        for key, entry in entries.items():
+            self.automaton.add_word(key, entry)
+        self.automaton.make_automaton()
+
+    def iter_matches(self, text: str) -> Iterator[tuple]:
+        """Yield (end_index, keyword, labels) for every keyword occurrence in text."""
+        if not text:
+            return
+        for end_index, (keyword, labels) in self.automaton.iter(text.lower()):
+            yield end_index, keyword, labels
+
+    def iter_segment_matches(self, texts: List[str]) -> Iterator[Tuple[int, str]]:
+        """
+        Yield (text_index, keyword) for keyword occurrences across many texts.
+
+        The texts are joined and scanned in one automaton pass; match offsets
+        are mapped back to the text they fall in. Matches are yielded in
+        order, so each text's matches are contiguous.
+
+        Args:
+            texts: Texts to scan, e.g. every text node of a document
+
+        Returns:
+            Iterator of (index into texts, keyword)
+        """
+        lowered = SEGMENT_SEPARATOR.join(texts).lower()
+
+        # Offsets are computed on the lowered texts, which only differ in
+        # length from the originals for a few non-ASCII characters
+        lowered_lengths = [len(text) for text in texts]
+        if len(lowered) != sum(lowered_lengths) + max(len(texts) - 1, 0):
+            lowered_texts = [text.lower() for text in texts]
+            lowered_lengths = [len(text) for text in lowered_texts]
+            lowered = SEGMENT_SEPARATOR.join(lowered_texts)
+
+        starts = []
+        position = 0
+        for length in lowered_lengths:
+            starts.append(position)
+            position += length + len(SEGMENT_SEPARATOR)
+
+        if not lowered:
+            return
+        for end_index, (keyword, _) in self.automaton.iter(lowered):
+            yield bisect_right(starts, end_index) - 1, keyword
+
+    def keywords_in(self, text: str) -> Set[str]:
+        """Return the distinct keywords occurring in text."""
+        return {keyword for _, keyword, _ in self.iter_matches(text)}
+
+    def first_label(self, text: str) -> Optional[str]:
+        """Return the highest-priority label with a keyword occurring in text."""
+        best = None
+        for _, _, labels in self.iter_matches(text):
+            for label in labels:
+                priority = self.priorities[label]
+                if best is None or priority < self.priorities[best]:
+                    best = label
+            if best is not None and self.priorities[best] == 0:
+                break
+
+        return best
@@ -0,0 +1,89 @@
+import asyncio
+import functools
+import logging
+import threading
+import weakref
+from typing import Awaitable, Callable, Generic, Optional, TypeVar
+from asgiref.sync import async_to_sync
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+# Every LoopLocal, so sync entry points can close what their loop created
+_registry = weakref.WeakSet()
+
+
+class LoopLocal(Generic[T]):
+    """
+    One lazily created object per running event loop.
+
+    Async HTTP clients bind their connection pool to the event loop they are
+    first used on. Services that outlive a single loop (a process-wide
+    QueryProcessor serving async views, or successive sync entry points)
+    need a separate client per loop.
+
+    Under ASGI (uvicorn) each worker has one long-lived loop, so its object
+    is created once and kept for the life of the process. Sync entry points
+    run on a throwaway loop; they go through async_to_sync_closing, which
+    closes the objects created on that loop before it is discarded.
+    """
+
+    def __init__(self, factory: Callable[[], T], aclose: Optional[Callable[[T], Awaitable]] = None):
+        self.factory = factory
+        self.closer = aclose
+        self.instances = weakref.WeakKeyDictionary()
+        self.lock = threading.Lock()
+        _registry.add(self)
+
+    def get(self) -> T:
+        """Return the object for the running event loop, creating it if needed."""
+        loop = asyncio.get_running_loop()
+
+        with self.lock:
+            instance = self.instances.get(loop)
+            if instance is None:
+                instance = self.instances[loop] = self.factory()
+
+        return instance
+
+    def has_instance(self) -> bool:
+        """Return whether an object exists for the running event loop."""
+        return asyncio.get_running_loop() in self.instances
+
+    async def aclose(self):
+        """Close and forget the object for the running event loop, if any."""
+        loop = asyncio.get_running_loop()
+
+        with self.lock:
+            instance = self.instances.pop(loop, None)
+
+        if instance is not None and self.closer is not None:
+            await self.closer(instance)
+
+
+def async_to_sync_closing(func: Callable[..., Awaitable[T]]) -> Callable[..., T]:
+    """
+    Wrap a coroutine function like async_to_sync, closing loop-local objects.
+
+    async_to_sync normally runs func on a new event loop that is discarded
+    afterwards; objects created on it are closed on that same loop before
+    it returns. Objects that already existed (func ran on a shared loop)
+    are left open for their other users.
+    """
+    @functools.wraps(func)
+    async def run(*args, **kwargs):
+        existing = {loop_local for loop_local in list(_registry) if loop_local.has_instance()}
+
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            for loop_local in list(_registry):
+                if loop_local in existing:
+                    continue
+                try:
+                    await loop_local.aclose()
+                except Exception as e:
+                    logger.warning(f"Failed to close loop-local client: {str(e)}")
+
+    return async_to_sync(run)
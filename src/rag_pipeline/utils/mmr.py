@@ -0,0 +1,47 @@
+import numpy as np
+from typing import List
+
+
+def mmr_select(relevance: np.ndarray, embeddings: np.ndarray, k: int, lambda_mult: float = 0.7) -> List[int]:
+    """
+    Pick k diverse, relevant candidates with maximal marginal relevance.
+
+    Pairwise candidate similarities come from one matrix product; each
+    greedy step is then a vectorized update rather than a Python loop over
+    candidate pairs.
+
+    Args:
+        relevance: Query similarity of each candidate, shape (n,)
+        embeddings: Candidate embeddings, shape (n, dimensions)
+        k: Number of candidates to select
+        lambda_mult: Weight of relevance versus diversity (1.0 = relevance only)
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    count = len(relevance)
+    k = min(k, count)
+    if k <= 0:
+        return []
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+    similarity = vectors @ vectors.T
+
+    selected = [int(np.argmax(relevance))]
+    available = np.ones(count, dtype=bool)
+    available[selected[0]] = False
+    # Highest similarity of each candidate to anything already selected
+    redundancy = similarity[selected[0]].copy()
+
+    while len(selected) < k:
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+
+    return selected
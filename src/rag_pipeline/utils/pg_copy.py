@@ -0,0 +1,46 @@
+from itertools import islice
+from typing import Any, Iterable, Optional, Sequence
+
+
+def copy_rows(
+    cursor,
+    table: str,
+    columns: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+    batch_size: Optional[int] = None
+) -> int:
+    """
+    Bulk load rows into a table with COPY ... FROM STDIN.
+
+    Rows are sent with psycopg's write_row, which handles escaping and NULLs
+    for every type. A new COPY statement is started every batch_size rows so
+    large inputs are loaded in bounded pieces.
+
+    Args:
+        cursor: Database cursor (psycopg or a Django wrapper around one)
+        table: Target table name
+        columns: Column names, in the order values appear in each row
+        rows: Iterable of row tuples
+        batch_size: Rows per COPY statement (None sends everything at once)
+
+    Returns:
+        Number of rows written
+    """
+    sql = f"COPY {table} ({', '.join(columns)}) FROM STDIN"
+    rows = iter(rows)
+    row_count = 0
+
+    while True:
+        batch = list(islice(rows, batch_size)) if batch_size else list(rows)
+        if not batch:
+            break
+
+        with cursor.copy(sql) as copy:
+            for row in batch:
+                copy.write_row(row)
+        row_count += len(batch)
+
+        if not batch_size:
+            break
+
+    return row_count
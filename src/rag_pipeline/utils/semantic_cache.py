@@ -0,0 +1,150 @@
+import copy
+import threading
+import time
+import numpy as np
+from typing import Dict, Optional, Sequence
+from django.conf import settings
+
+_cache = None
+_retrieval_cache = None
+_cache_lock = threading.Lock()
+
+
+class SemanticQueryCache:
+    """
+    In-process cache of query results keyed by query embedding similarity.
+
+    A query whose embedding is within the cosine similarity threshold of a
+    recent query (for the same year and top_k) reuses that query's result,
+    skipping retrieval and answer generation. Embeddings are stored as a
+    float16 matrix so a lookup is one matrix-vector product.
+    """
+
+    def __init__(self, max_entries: int, threshold: float, ttl_seconds: float, dimensions: int = 1536):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.embeddings = np.zeros((max_entries, dimensions), dtype=np.float16)
+        self.years = np.zeros(max_entries, dtype=np.int32)
+        self.top_ks = np.zeros(max_entries, dtype=np.int32)
+        self.expires_at = np.zeros(max_entries, dtype=np.float64)   # 0 = empty slot
+        self.last_used = np.zeros(max_entries, dtype=np.float64)
+        self.results = [None] * max_entries
+        self.lock = threading.Lock()
+
+    def get(self, embedding: Sequence[float], year: int, top_k: int) -> Optional[Dict]:
+        """
+        Return the cached result for a semantically equivalent query, if any.
+
+        Args:
+            embedding: Query embedding
+            year: Year filter of the query
+            top_k: Number of chunks requested
+
+        Returns:
+            Copy of the cached result, or None on a miss
+        """
+        query = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self.lock:
+            slot = self._matching_slot(query, year, top_k, now)
+            if slot is None:
+                return None
+
+            self.last_used[slot] = now
+            return copy.deepcopy(self.results[slot])
+
+    def set(self, embedding: Sequence[float], year: int, top_k: int, result: Dict):
+        """
+        Cache a query result, evicting the least recently used entry when full.
+
+        A live entry for an equivalent query is replaced rather than duplicated.
+
+        Args:
+            embedding: Query embedding
+            year: Year filter of the query
+            top_k: Number of chunks requested
+            result: Query result to reuse for similar queries
+        """
+        query = self._normalize(embedding)
+        now = time.monotonic()
+
+        with self.lock:
+            slot = self._matching_slot(query, year, top_k, now)
+            if slot is None:
+                # Expired and empty slots have expires_at <= now; reuse those first
+                free = np.flatnonzero(self.expires_at <= now)
+                slot = free[0] if free.size else int(np.argmin(self.last_used))
+
+            self.embeddings[slot] = query
+            self.years[slot] = year
+            self.top_ks[slot] = top_k
+            self.expires_at[slot] = now + self.ttl_seconds
+            self.last_used[slot] = now
+            self.results[slot] = copy.deepcopy(result)
+
+    def _matching_slot(self, query: np.ndarray, year: int, top_k: int, now: float) -> Optional[int]:
+        """Return the live slot most similar to query if it meets the threshold."""
+        candidates = np.flatnonzero(
+            (self.expires_at > now) & (self.years == year) & (self.top_ks == top_k)
+        )
+        if not candidates.size:
+            return None
+
+        scores = self.embeddings[candidates].astype(np.float32) @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.threshold:
+            return None
+
+        return int(candidates[best])
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> np.ndarray:
+        """Return the embedding as a unit-length float32 vector."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def get_semantic_cache() -> Optional[SemanticQueryCache]:
+    """Return the process-wide semantic query cache, or None when disabled."""
+    global _cache
+
+    if not settings.SEMANTIC_CACHE_ENABLED:
+        return None
+
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = SemanticQueryCache(
+                    max_entries=settings.SEMANTIC_CACHE_SIZE,
+                    threshold=settings.SEMANTIC_CACHE_THRESHOLD,
+                    ttl_seconds=settings.SEMANTIC_CACHE_TTL
+                )
+
+    return _cache
+
+
+def get_retrieval_cache() -> Optional[SemanticQueryCache]:
+    """
+    Return the process-wide cache of retrieved chunks, or None when disabled.
+
+    Entries hold {'chunks': [...]} for recent queries. Its threshold is looser
+    than the answer cache's: a hit is only used to start answer generation
+    speculatively, and is checked against the real retrieval before use.
+    """
+    global _retrieval_cache
+
+    if not settings.SPECULATIVE_RETRIEVAL_ENABLED:
+        return None
+
+    if _retrieval_cache is None:
+        with _cache_lock:
+            if _retrieval_cache is None:
+                _retrieval_cache = SemanticQueryCache(
+                    max_entries=settings.SEMANTIC_CACHE_SIZE,
+                    threshold=settings.SPECULATIVE_RETRIEVAL_THRESHOLD,
+                    ttl_seconds=settings.SEMANTIC_CACHE_TTL
+                )
+
+    return _retrieval_cache
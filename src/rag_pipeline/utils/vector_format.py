@@ -0,0 +1,60 @@
+import numpy as np
+from typing import Dict, List, Sequence
+
+# Cached '[%.9g,%.9g,...]' templates keyed by dimension count
+_TEMPLATES: Dict[int, str] = {}
+
+
+def format_vector(embedding: Sequence[float]) -> str:
+    """
+    Format an embedding as a pgvector text literal ('[v1,v2,...]').
+
+    Values are converted to float32 once and rendered with a single
+    %-format call, instead of one str() call per element. Nine significant
+    digits round-trip float32 exactly.
+
+    Args:
+        embedding: Embedding values
+
+    Returns:
+        pgvector text representation
+    """
+    values = np.asarray(embedding, dtype=np.float32)
+    dimensions = values.shape[0]
+
+    template = _TEMPLATES.get(dimensions)
+    if template is None:
+        template = _TEMPLATES[dimensions] = '[' + ','.join(['%.9g'] * dimensions) + ']'
+
+    return template % tuple(values.tolist())
+
+
+def normalize_vector(embedding: Sequence[float]) -> np.ndarray:
+    """
+    Scale an embedding to unit L2 norm.
+
+    For unit vectors inner product equals cosine similarity, so stored and
+    query embeddings are normalized and searched with inner product.
+
+    Args:
+        embedding: Embedding values
+
+    Returns:
+        Normalized float32 values (unchanged if the norm is zero)
+    """
+    values = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(values)
+    return values / norm if norm else values
+
+
+def parse_vector(text: str) -> List[float]:
+    """
+    Parse a pgvector text literal ('[v1,v2,...]') into a list of floats.
+
+    Args:
+        text: pgvector text representation
+
+    Returns:
+        Embedding values
+    """
+    return np.array(text[1:-1].split(','), dtype=np.float32).tolist()
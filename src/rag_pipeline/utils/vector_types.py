@@ -0,0 +1,43 @@
+import logging
+from pgvector.psycopg.halfvec import register_halfvec_info
+from psycopg.types import TypeInfo
+
+logger = logging.getLogger(__name__)
+
+
+def register_vector_types(raw_connection) -> bool:
+    """
+    Register pgvector's halfvec adapters on a psycopg connection.
+
+    With the adapters registered, halfvec columns are returned as
+    pgvector.HalfVector objects; fetched in binary format they are decoded
+    straight from the wire bytes instead of parsing '[v1,v2,...]' text.
+    Pooled connections keep their adapters, so the type lookup only runs
+    once per physical connection.
+
+    Args:
+        raw_connection: psycopg connection
+
+    Returns:
+        True if halfvec is available, False if the extension isn't installed yet
+    """
+    if raw_connection.adapters.types.get('halfvec') is not None:
+        return True
+
+    info = TypeInfo.fetch(raw_connection, 'halfvec')
+    if info is None:
+        return False
+
+    register_halfvec_info(raw_connection, info)
+    return True
+
+
+def register_on_connection_created(sender, connection, **kwargs):
+    """connection_created handler registering halfvec on PostgreSQL connections."""
+    if connection.vendor != 'postgresql':
+        return
+
+    try:
+        register_vector_types(connection.connection)
+    except Exception as e:
+        logger.warning(f"Failed to register pgvector types: {str(e)}")
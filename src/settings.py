@@ -26,6 +26,7 @@ INSTALLED_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'rest_framework',
+    'adrf',
     'rag_pipeline',
 ]
 
@@ -58,6 +59,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'wsgi.application'
+ASGI_APPLICATION = 'asgi.application'
 
 # Database
 DATABASES = {
@@ -68,6 +70,14 @@ DATABASES = {
         'PASSWORD': config('DB_PASS', default='postgres'),
         'HOST': config('DB_HOST', default='db'),
         'PORT': '5432',  # Internal Docker port, external mapping handled by docker-compose
+        # psycopg 3 connection pool; requests borrow a connection instead of
+        # reconnecting (requires CONN_MAX_AGE = 0, the default)
+        'OPTIONS': {
+            'pool': {
+                'min_size': config('DB_POOL_MIN_SIZE', default=5, cast=int),
+                'max_size': config('DB_POOL_MAX_SIZE', default=20, cast=int),
+            },
+        },
     }
 }
 
@@ -115,6 +125,33 @@ REST_FRAMEWORK = {
 # OpenAI Configuration
 OPENAI_API_KEY = config('OPENAI_API_KEY', default='')
 
+# Number of texts sent per embeddings request (OpenAI accepts up to 2048 inputs)
+EMBEDDING_BATCH_SIZE = config('EMBEDDING_BATCH_SIZE', default=256, cast=int)
+
+# Reuse embeddings for previously seen texts (embedding_cache table)
+EMBEDDING_CACHE_ENABLED = config('EMBEDDING_CACHE_ENABLED', default=True, cast=bool)
+
+# Embeddings kept in an in-process LRU in front of embedding_cache (0 = disabled)
+EMBEDDING_MEMORY_CACHE_SIZE = config('EMBEDDING_MEMORY_CACHE_SIZE', default=10000, cast=int)
+
+# OpenAI usage tier (free, tier1 ... tier5); bounds concurrent embedding requests
+OPENAI_USAGE_TIER = config('OPENAI_USAGE_TIER', default='tier1')
+
+# OpenAI rate limiting and retry behaviour
+OPENAI_MAX_REQUESTS_PER_MINUTE = config('OPENAI_MAX_REQUESTS_PER_MINUTE', default=3000, cast=int)
+OPENAI_RETRY_ATTEMPTS = config('OPENAI_RETRY_ATTEMPTS', default=5, cast=int)
+OPENAI_RETRY_DELAY = config('OPENAI_RETRY_DELAY', default=1.0, cast=float)
+
+# Rows sent per COPY statement when bulk loading chunks and embeddings
+INGEST_BULK_BATCH_SIZE = config('INGEST_BULK_BATCH_SIZE', default=500, cast=int)
+
+# HNSW index tuning (0 = choose automatically from the vector count)
+HNSW_M = config('HNSW_M', default=0, cast=int)
+HNSW_EF_CONSTRUCTION = config('HNSW_EF_CONSTRUCTION', default=0, cast=int)
+HNSW_EF_SEARCH = config('HNSW_EF_SEARCH', default=0, cast=int)
+HNSW_MAINTENANCE_WORK_MEM = config('HNSW_MAINTENANCE_WORK_MEM', default='2GB')
+HNSW_MAX_PARALLEL_WORKERS = config('HNSW_MAX_PARALLEL_WORKERS', default=7, cast=int)
+
 # Langfuse Configuration
 LANGFUSE_PUBLIC_KEY = config('LANGFUSE_PUBLIC_KEY', default='')
 LANGFUSE_SECRET_KEY = config('LANGFUSE_SECRET_KEY', default='')
@@ -124,6 +161,35 @@ LANGFUSE_HOST = config('LANGFUSE_HOST', default='https://cloud.langfuse.com')
 OLLAMA_BASE_URL = config('OLLAMA_BASE_URL', default='http://localhost:11434')
 OLLAMA_MODEL = config('OLLAMA_MODEL', default='llama3.2')
 
+# Directory for gzip-compressed copies of raw 10-K HTML (empty = don't archive)
+RAW_HTML_DIR = config('RAW_HTML_DIR', default='')
+
+# Reuse answers for near-identical recent queries (cosine similarity >= threshold)
+SEMANTIC_CACHE_ENABLED = config('SEMANTIC_CACHE_ENABLED', default=True, cast=bool)
+SEMANTIC_CACHE_SIZE = config('SEMANTIC_CACHE_SIZE', default=256, cast=int)
+SEMANTIC_CACHE_THRESHOLD = config('SEMANTIC_CACHE_THRESHOLD', default=0.97, cast=float)
+SEMANTIC_CACHE_TTL = config('SEMANTIC_CACHE_TTL', default=3600, cast=int)
+
+# Longer queries are truncated to this many tokens before embedding
+QUERY_MAX_EMBEDDING_TOKENS = config('QUERY_MAX_EMBEDDING_TOKENS', default=256, cast=int)
+
+# Rerank retrieved chunks for diversity with maximal marginal relevance
+RETRIEVAL_MMR_ENABLED = config('RETRIEVAL_MMR_ENABLED', default=False, cast=bool)
+RETRIEVAL_MMR_LAMBDA = config('RETRIEVAL_MMR_LAMBDA', default=0.7, cast=float)
+RETRIEVAL_MMR_CANDIDATE_FACTOR = config('RETRIEVAL_MMR_CANDIDATE_FACTOR', default=4, cast=int)
+
+# Re-scan with a wider hnsw.ef_search when the best match is weak; both scans
+# run inside search_year_embeddings, so deepening adds index work but no round trip
+RETRIEVAL_DEEPEN_THRESHOLD = config('RETRIEVAL_DEEPEN_THRESHOLD', default=0.6, cast=float)
+RETRIEVAL_DEEPEN_EF_SEARCH = config('RETRIEVAL_DEEPEN_EF_SEARCH', default=200, cast=int)
+
+# Start answering from a similar recent query's chunks while retrieval runs
+SPECULATIVE_RETRIEVAL_ENABLED = config('SPECULATIVE_RETRIEVAL_ENABLED', default=True, cast=bool)
+SPECULATIVE_RETRIEVAL_THRESHOLD = config('SPECULATIVE_RETRIEVAL_THRESHOLD', default=0.9, cast=float)
+
+# Write query history from a background thread instead of the request path
+QUERY_HISTORY_ASYNC = config('QUERY_HISTORY_ASYNC', default=True, cast=bool)
+
 # Apple 10-K URLs
 AAPL_2023_10K_URL = config('AAPL_2023_10K_URL', default='')
 AAPL_2024_10K_URL = config('AAPL_2024_10K_URL', default='')
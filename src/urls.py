@@ -2,9 +2,13 @@
 URL configuration for stock-rag project.
 """
 from django.contrib import admin
+from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.urls import path, include
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include('rag_pipeline.urls')),
 ]
+
+# uvicorn does not serve static files; mirror runserver while DEBUG is on
+urlpatterns += staticfiles_urlpatterns()
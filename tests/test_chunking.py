@@ -0,0 +1,88 @@
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from rag_pipeline.utils.chunking import TextChunker, TextSplitter
+
+# Multi-section 10-K excerpt; sentence word counts are noted for the expectations below
+SENTENCES = [
+    'Business overview.',                                             # 2
+    'Apple designs products and services for a global market.',       # 9
+    'Risk factors include supply chain risks and uncertainties.',     # 8
+    'Competition is intense in every segment.',                       # 6
+    'The company depends on key suppliers!',                          # 6
+    'Management discussion covers operating results for the year.',   # 8
+    'Net sales grew eight percent?',                                  # 5
+    'Services revenue reached a record high.',                        # 6
+    'The consolidated statements of operations follow.',              # 6
+    'The balance sheet shows strong cash reserves.',                  # 7
+]
+
+
+class WordEncoding:
+    """Stand-in tokenizer: one token per word."""
+
+    def encode_batch(self, texts):
+        return [text.split() for text in texts]
+
+
+class SentenceChunkingTest(SimpleTestCase):
+    def setUp(self):
+        self.chunker = TextChunker.__new__(TextChunker)
+        self.chunker.chunk_size = 20
+        self.chunker.overlap = 0
+        self.chunker.encoding = WordEncoding()
+        self.chunker.splitter = None
+
+    def test_chunk_boundaries_and_overlap(self):
+        """Test that chunk boundaries, token counts and 2-sentence overlap match the baseline chunker."""
+        chunks = self.chunker.chunk_text(' '.join(SENTENCES))
+
+        # (start, end, token_count, section) per chunk, as sentence ranges
+        expected = [
+            (0, 3, 19, 'Risk Factors'),
+            (1, 4, 23, 'Risk Factors'),
+            (2, 5, 20, 'Risk Factors'),
+            (3, 6, 20, 'MD&A'),
+            (4, 7, 19, 'MD&A'),
+            (5, 8, 19, 'MD&A'),
+            (6, 9, 17, 'Financial Statements'),
+            (7, 10, 19, 'Financial Statements'),
+        ]
+        self.assertEqual(
+            [(c['text'], c['token_count'], c['section']) for c in chunks],
+            [(' '.join(SENTENCES[start:end]), tokens, section) for start, end, tokens, section in expected]
+        )
+
+    def test_short_chunks_carry_no_overlap(self):
+        """Test that a chunk of two sentences or fewer is not carried into the next one."""
+        self.chunker.chunk_size = 11
+        chunks = self.chunker.chunk_text(' '.join(SENTENCES[:3]))
+
+        self.assertEqual([c['text'] for c in chunks], [' '.join(SENTENCES[:2]), SENTENCES[2]])
+        self.assertEqual([c['token_count'] for c in chunks], [11, 8])
+
+
+@skipIf(TextSplitter is None, "semantic-text-splitter not installed")
+class SplitterChunkingTest(SimpleTestCase):
+    def setUp(self):
+        try:
+            self.chunker = TextChunker(chunk_size=40, overlap=15)
+        except Exception as e:  # tiktoken data may not be downloadable
+            self.skipTest(f"tiktoken encoding unavailable: {e}")
+
+    def test_chunks_respect_size_and_overlap(self):
+        """Test that splitter chunks stay within chunk_size and overlap by at most overlap tokens."""
+        chunks = self.chunker.chunk_text(' '.join(SENTENCES * 3))
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertLessEqual(chunk['token_count'], self.chunker.chunk_size)
+            self.assertEqual(chunk['token_count'], len(self.chunker.encoding.encode(chunk['text'])))
+
+        for previous, current in zip(chunks, chunks[1:]):
+            shared = max(
+                (n for n in range(1, len(current['text']) + 1) if previous['text'].endswith(current['text'][:n])),
+                default=0
+            )
+            self.assertGreater(shared, 0)
+            self.assertLessEqual(len(self.chunker.encoding.encode(current['text'][:shared])), self.chunker.overlap)
@@ -0,0 +1,60 @@
+from unittest.mock import MagicMock, patch
+from django.test import SimpleTestCase, override_settings
+from rag_pipeline.services.document_processor import DocumentProcessor
+
+
+@override_settings(RAW_HTML_DIR='')
+class ContentHashSkipTest(SimpleTestCase):
+    def setUp(self):
+        self.processor = DocumentProcessor.__new__(DocumentProcessor)
+        self.processor.chunker = MagicMock()
+        self.processor.chunker.chunk_text.return_value = [{'text': 'Revenue grew.'}]
+        self.processor.html_parser = MagicMock()
+        self.processor.html_parser.parse_10k.return_value = {'full_text': 'Revenue grew.', 'sections': {}}
+
+        # Content hashes of finalized documents, standing in for documents.content_sha256
+        self.finalized_hashes = {}
+
+        def find_unchanged(company, year, content_sha256):
+            return self.finalized_hashes.get(content_sha256)
+
+        def finalize(company, year, document_id, content_sha256):
+            self.finalized_hashes[content_sha256] = (document_id, 1)
+
+        for name, kwargs in [
+            ('_fetch_document', {'return_value': b'<html>10-K</html>'}),
+            ('_find_unchanged_document', {'side_effect': find_unchanged}),
+            ('_store_document', {'return_value': 'doc-1'}),
+            ('_agenerate_chunk_embeddings', {'return_value': [[0.1]]}),
+            ('_store_chunks_and_embeddings', {'return_value': 1}),
+            ('_finalize_document', {'side_effect': finalize}),
+            ('_update_document_status', {}),
+        ]:
+            patcher = patch.object(self.processor, name, **kwargs)
+            setattr(self, name.lstrip('_'), patcher.start())
+            self.addCleanup(patcher.stop)
+
+    async def test_failed_load_is_retried_in_full(self):
+        """Test that a run failing after the document insert doesn't make the retry a no-op."""
+        self.store_chunks_and_embeddings.side_effect = RuntimeError('COPY failed')
+
+        failed = await self.processor.aprocess_document('file:///10k.html', 'Apple Inc.', 2023)
+
+        self.assertFalse(failed['success'])
+        self.finalize_document.assert_not_called()
+
+        self.store_chunks_and_embeddings.side_effect = None
+        retried = await self.processor.aprocess_document('file:///10k.html', 'Apple Inc.', 2023)
+
+        self.assertTrue(retried['success'])
+        self.assertNotIn('skipped', retried)
+        self.finalize_document.assert_called_once()
+        self.update_document_status.assert_called_once_with('Apple Inc.', 2023, 'completed', 1)
+
+    async def test_unchanged_content_skips_after_success(self):
+        """Test that the same content is skipped once it has been fully loaded."""
+        await self.processor.aprocess_document('file:///10k.html', 'Apple Inc.', 2023)
+        result = await self.processor.aprocess_document('file:///10k.html', 'Apple Inc.', 2023)
+
+        self.assertTrue(result['skipped'])
+        self.store_chunks_and_embeddings.assert_called_once()
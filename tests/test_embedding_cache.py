@@ -0,0 +1,49 @@
+from contextlib import nullcontext
+from unittest.mock import patch
+from django.test import SimpleTestCase
+from rag_pipeline.services.embedding_cache import EmbeddingCache, MemoryLRU
+
+
+class MemoryLRUTest(SimpleTestCase):
+    def test_evicts_least_recently_used(self):
+        """Test that reads refresh recency and the oldest key is evicted."""
+        lru = MemoryLRU(max_entries=2)
+        lru.set_many({'a': [1.0], 'b': [2.0]})
+        lru.get_many(['a'])
+        lru.set_many({'c': [3.0]})
+
+        self.assertEqual(lru.get_many(['a', 'b', 'c']), {'a': [1.0], 'c': [3.0]})
+
+
+class EmbeddingCacheMemoryTest(SimpleTestCase):
+    def test_memory_hits_skip_database(self):
+        """Test that only keys missing from memory are looked up in the table."""
+        cache = EmbeddingCache('text-embedding-3-small')
+        cache.memory = MemoryLRU(max_entries=10)
+        cache.memory.set_many({('text-embedding-3-small', b'hot'): [1.0]})
+
+        with patch.object(cache, '_get_many_from_db', return_value={b'cold': [2.0]}) as mock_db:
+            embeddings = cache.get_many([b'hot', b'cold'])
+
+        mock_db.assert_called_once_with([b'cold'])
+        self.assertEqual(embeddings, {b'hot': [1.0], b'cold': [2.0]})
+
+        with patch.object(cache, '_get_many_from_db') as mock_db:
+            self.assertEqual(cache.get_many([b'hot']), {b'hot': [1.0]})
+        mock_db.assert_not_called()
+
+
+@patch('rag_pipeline.services.embedding_cache.transaction.atomic', return_value=nullcontext())
+@patch('rag_pipeline.services.embedding_cache.connection')
+class EmbeddingCacheStoreTest(SimpleTestCase):
+    def test_conflicts_are_per_model(self, mock_connection, mock_atomic):
+        """Test that an existing hash under another model does not block the insert."""
+        cursor = mock_connection.cursor.return_value.__enter__.return_value
+        cache = EmbeddingCache('text-embedding-3-large')
+        cache.memory = None
+
+        cache.set_many({b'hash': [1.0]})
+
+        sql, params = cursor.execute.call_args.args
+        self.assertIn('ON CONFLICT (text_hash, model) DO NOTHING', sql)
+        self.assertEqual(params, [b'hash', '[1]', 'text-embedding-3-large'])
@@ -0,0 +1,192 @@
+import time
+from unittest.mock import patch
+import httpx
+import openai
+from django.test import SimpleTestCase, override_settings
+from rag_pipeline.services.embedding_cache import EmbeddingCache
+from rag_pipeline.services.embedding_service import EmbeddingService, retry_with_backoff
+
+
+@override_settings(OPENAI_API_KEY='test-key', EMBEDDING_CACHE_ENABLED=False)
+class EmbeddingServiceConcurrencyTest(SimpleTestCase):
+    def test_concurrent_embeddings_preserve_order(self):
+        """Test that concurrent batches are reassembled in input order."""
+        service = EmbeddingService()
+        texts = [f'chunk {i}' for i in range(10)]
+
+        def fake_batch(batch):
+            return [[float(text.split()[1])] for text in batch]
+
+        with patch.object(service, '_create_embeddings', side_effect=fake_batch):
+            embeddings = service.generate_embeddings_concurrent(texts, batch_size=3, max_concurrency=4)
+
+        self.assertEqual(embeddings, [[float(i)] for i in range(10)])
+
+    def test_failed_batch_cancels_queued_batches(self):
+        """Test that a permanently failed batch stops the batches still queued."""
+        service = EmbeddingService()
+        texts = [f'chunk {i}' for i in range(10)]
+        calls = []
+
+        def fake_batch(batch):
+            calls.append(batch)
+            if batch[0] == 'chunk 0':
+                raise ValueError('bad input')
+            time.sleep(0.05)
+            return [[0.0] for _ in batch]
+
+        with patch.object(service, '_create_embeddings', side_effect=fake_batch), self.assertRaises(ValueError):
+            service.generate_embeddings_concurrent(texts, batch_size=2, max_concurrency=1)
+
+        self.assertLessEqual(len(calls), 2)
+
+    def test_batch_splits_into_requests(self):
+        """Test that large batches are sent as several requests of batch_size texts."""
+        service = EmbeddingService()
+        texts = [f'chunk {i}' for i in range(5)]
+
+        with patch.object(service, '_create_embeddings', side_effect=lambda batch: [[float(t.split()[1])] for t in batch]) as mock_create:
+            embeddings = service.generate_embeddings_batch(texts, batch_size=2)
+
+        self.assertEqual([len(c.args[0]) for c in mock_create.call_args_list], [2, 2, 1])
+        self.assertEqual(embeddings, [[float(i)] for i in range(5)])
+
+    async def test_async_batch_splits_into_requests(self):
+        """Test that the async batch path also sends batch_size texts per request."""
+        service = EmbeddingService()
+        texts = [f'chunk {i}' for i in range(5)]
+
+        async def fake_batch(batch):
+            return [[float(t.split()[1])] for t in batch]
+
+        with patch.object(service, '_acreate_embeddings', side_effect=fake_batch) as mock_create:
+            embeddings = await service.agenerate_embeddings_batch(texts, batch_size=2)
+
+        self.assertEqual([len(c.args[0]) for c in mock_create.call_args_list], [2, 2, 1])
+        self.assertEqual(embeddings, [[float(i)] for i in range(5)])
+
+    @override_settings(OPENAI_USAGE_TIER='tier4')
+    def test_max_concurrency_from_usage_tier(self):
+        """Test that the usage tier maps to an in-flight request limit."""
+        self.assertEqual(EmbeddingService.max_concurrency(), 125)
+
+    @override_settings(OPENAI_USAGE_TIER='unknown')
+    def test_max_concurrency_unknown_tier(self):
+        """Test that an unknown usage tier falls back to free tier limits."""
+        self.assertEqual(EmbeddingService.max_concurrency(), 1)
+
+
+class FakeEmbeddingCache(EmbeddingCache):
+    def __init__(self, entries=None):
+        super().__init__('text-embedding-3-small')
+        self.entries = dict(entries or {})
+
+    def get_many(self, text_hashes):
+        return {h: self.entries[h] for h in text_hashes if h in self.entries}
+
+    def set_many(self, embeddings):
+        self.entries.update(embeddings)
+
+
+@override_settings(OPENAI_API_KEY='test-key')
+class EmbeddingServiceCacheTest(SimpleTestCase):
+    def test_cache_hits_skip_api_calls(self):
+        """Test that only uncached, unique texts are sent to the API."""
+        service = EmbeddingService()
+        service.cache = FakeEmbeddingCache({EmbeddingCache.hash_text('cached'): [9.0]})
+
+        with patch.object(service, '_create_embeddings', side_effect=lambda batch: [[float(len(t))] for t in batch]) as mock_create:
+            embeddings = service.generate_embeddings_batch(['cached', 'new', 'cached', 'new'])
+
+        mock_create.assert_called_once_with(['new'])
+        self.assertEqual(embeddings, [[9.0], [3.0], [9.0], [3.0]])
+        self.assertIn(EmbeddingCache.hash_text('new'), service.cache.entries)
+
+    async def test_async_cache_hits_skip_api_calls(self):
+        """Test that the async batch path also only embeds uncached, unique texts."""
+        service = EmbeddingService()
+        service.cache = FakeEmbeddingCache({EmbeddingCache.hash_text('cached'): [9.0]})
+
+        async def fake_batch(batch):
+            return [[float(len(t))] for t in batch]
+
+        with patch.object(service, '_acreate_embeddings', side_effect=fake_batch) as mock_create:
+            embeddings = await service.agenerate_embeddings_batch(['cached', 'new', 'new'])
+
+        mock_create.assert_called_once_with(['new'])
+        self.assertEqual(embeddings, [[9.0], [3.0], [3.0]])
+
+
+def _rate_limit_error(retry_after=None):
+    headers = {'retry-after': retry_after} if retry_after else {}
+    response = httpx.Response(429, headers=headers, request=httpx.Request('POST', 'https://api.openai.com/v1/embeddings'))
+    return openai.RateLimitError('Rate limit exceeded', response=response, body=None)
+
+
+@patch('rag_pipeline.services.embedding_service.time.sleep')
+class RetryWithBackoffTest(SimpleTestCase):
+    def test_retries_with_exponential_delay(self, mock_sleep):
+        """Test that failures are retried with doubling delays."""
+        calls = []
+
+        @retry_with_backoff(max_attempts=4, base_delay=1.0)
+        def flaky():
+            calls.append(1)
+            if len(calls) < 4:
+                raise _rate_limit_error()
+            return 'ok'
+
+        with self.assertNoLogs('rag_pipeline.services.embedding_service', level='ERROR'):
+            self.assertEqual(flaky(), 'ok')
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [1.0, 2.0, 4.0])
+
+    def test_honours_retry_after_header(self, mock_sleep):
+        """Test that a longer Retry-After header overrides the backoff delay."""
+        errors = [_rate_limit_error(retry_after='7')]
+
+        @retry_with_backoff(max_attempts=2, base_delay=1.0)
+        def limited():
+            if errors:
+                raise errors.pop()
+            return 'ok'
+
+        self.assertEqual(limited(), 'ok')
+        mock_sleep.assert_called_once_with(7.0)
+
+    def test_gives_up_after_max_attempts(self, mock_sleep):
+        """Test that the last error is raised once attempts are exhausted."""
+        @retry_with_backoff(max_attempts=3, base_delay=1.0)
+        def always_limited():
+            raise _rate_limit_error()
+
+        with self.assertLogs('rag_pipeline.services.embedding_service', level='ERROR') as logs, \
+                self.assertRaises(openai.RateLimitError):
+            always_limited()
+        self.assertEqual(mock_sleep.call_count, 2)
+        self.assertEqual(len(logs.records), 1)
+
+    def test_non_retryable_errors_raise_immediately(self, mock_sleep):
+        """Test that errors other than transient API failures are not retried."""
+        @retry_with_backoff(max_attempts=3, base_delay=1.0)
+        def broken():
+            raise ValueError('bad input')
+
+        with self.assertRaises(ValueError):
+            broken()
+        mock_sleep.assert_not_called()
+
+    @patch('rag_pipeline.services.embedding_service.asyncio.sleep')
+    async def test_async_functions_retry_without_blocking(self, mock_async_sleep, mock_sleep):
+        """Test that coroutines are retried with asyncio.sleep instead of time.sleep."""
+        calls = []
+
+        @retry_with_backoff(max_attempts=3, base_delay=1.0)
+        async def flaky():
+            calls.append(1)
+            if len(calls) < 3:
+                raise _rate_limit_error()
+            return 'ok'
+
+        self.assertEqual(await flaky(), 'ok')
+        self.assertEqual([c.args[0] for c in mock_async_sleep.call_args_list], [1.0, 2.0])
+        mock_sleep.assert_not_called()
@@ -0,0 +1,63 @@
+from unittest.mock import patch
+from django.test import SimpleTestCase, override_settings
+from rag_pipeline.utils.hnsw import configure_hnsw_params, create_year_index, ef_search_for_top_k
+
+
+class ConfigureHnswParamsTest(SimpleTestCase):
+    def test_params_scale_with_vector_count(self):
+        """Test that larger vector counts get denser graphs."""
+        self.assertEqual(configure_hnsw_params(5_000), {'m': 16, 'ef_construction': 64, 'ef_search': 40})
+        self.assertEqual(configure_hnsw_params(500_000), {'m': 24, 'ef_construction': 100, 'ef_search': 100})
+        self.assertEqual(configure_hnsw_params(5_000_000), {'m': 32, 'ef_construction': 128, 'ef_search': 200})
+
+    @override_settings(HNSW_M=48, HNSW_EF_SEARCH=80)
+    def test_settings_override_auto_params(self):
+        """Test that explicit settings take precedence over the automatic choice."""
+        self.assertEqual(configure_hnsw_params(5_000), {'m': 48, 'ef_construction': 64, 'ef_search': 80})
+
+
+class FakeCursor:
+    def __init__(self, vector_count):
+        self.vector_count = vector_count
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((' '.join(sql.split()), params))
+
+    def fetchone(self):
+        return (self.vector_count,)
+
+
+class CreateYearIndexTest(SimpleTestCase):
+    def test_creates_partial_index_for_year(self):
+        """Test that the index is restricted to one year and sized for its vectors."""
+        cursor = FakeCursor(500_000)
+
+        params = create_year_index(cursor, 2023)
+
+        self.assertEqual(params['m'], 24)
+        create_sql, create_params = next(s for s in cursor.statements if s[0].startswith('CREATE INDEX'))
+        self.assertIn('embeddings_2023_hnsw', create_sql)
+        self.assertTrue(create_sql.endswith('WHERE year = 2023;'))
+        self.assertEqual(create_params, [24, 100])
+        self.assertFalse(any(s[0].startswith('DROP INDEX') for s in cursor.statements))
+
+    def test_rebuild_drops_existing_index(self):
+        """Test that rebuild drops the year's index before recreating it."""
+        cursor = FakeCursor(10)
+
+        create_year_index(cursor, 2024, rebuild=True)
+
+        self.assertIn(('DROP INDEX IF EXISTS embeddings_2024_hnsw;', None), cursor.statements)
+
+
+@patch('rag_pipeline.utils.hnsw.get_ef_search', return_value=40)
+class EfSearchForTopKTest(SimpleTestCase):
+    def test_configured_value_used_for_small_top_k(self, mock_get):
+        """Test that the configured ef_search is used when it covers top_k."""
+        self.assertEqual(ef_search_for_top_k(5), 40)
+
+    def test_raised_for_large_top_k(self, mock_get):
+        """Test that ef_search grows with top_k and stays within pgvector's limit."""
+        self.assertEqual(ef_search_for_top_k(20), 80)
+        self.assertEqual(ef_search_for_top_k(500), 1000)
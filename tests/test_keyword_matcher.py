@@ -0,0 +1,41 @@
+from django.test import SimpleTestCase
+from rag_pipeline.utils.keyword_matcher import KeywordMatcher
+
+
+class KeywordMatcherTest(SimpleTestCase):
+    def setUp(self):
+        self.matcher = KeywordMatcher({
+            'MD&A': ['management discussion', 'md&a'],
+            'Risk Factors': ['risk factors'],
+            'Business Overview': ['market'],
+        })
+
+    def test_first_label_respects_priority(self):
+        """Test that the highest-priority section wins regardless of match position."""
+        text = 'Market conditions are described under Risk Factors and in MD&A.'
+        self.assertEqual(self.matcher.first_label(text), 'MD&A')
+        self.assertEqual(self.matcher.first_label('See RISK FACTORS and market data.'), 'Risk Factors')
+
+    def test_no_match(self):
+        """Test that text without keywords has no label."""
+        self.assertIsNone(self.matcher.first_label('Nothing relevant here.'))
+        self.assertIsNone(self.matcher.first_label(''))
+
+    def test_keywords_in(self):
+        """Test that distinct keywords are found case-insensitively."""
+        self.assertEqual(
+            self.matcher.keywords_in('Market share and MARKET risk; Management Discussion'),
+            {'market', 'management discussion'}
+        )
+
+    def test_iter_segment_matches_maps_offsets_to_texts(self):
+        """Test that matches in a joined scan are attributed to the right text."""
+        texts = ['Intro', 'Market update', '', 'risk factors and MARKET', 'İstanbul market']
+        self.assertEqual(
+            list(self.matcher.iter_segment_matches(texts)),
+            [(1, 'market'), (3, 'risk factors'), (3, 'market'), (4, 'market')]
+        )
+
+    def test_matches_do_not_span_texts(self):
+        """Test that a keyword split across two texts is not matched."""
+        self.assertEqual(list(self.matcher.iter_segment_matches(['risk', 'factors'])), [])
@@ -0,0 +1,62 @@
+import asyncio
+from asgiref.sync import sync_to_async
+from django.test import SimpleTestCase
+from rag_pipeline.utils.loop_local import LoopLocal, async_to_sync_closing
+
+
+class Client:
+    closed = []
+
+    async def aclose(self):
+        Client.closed.append(self)
+
+
+class LoopLocalTest(SimpleTestCase):
+    def setUp(self):
+        Client.closed = []
+
+    def test_one_instance_per_event_loop(self):
+        """Test that an instance is reused within a loop and recreated for a new loop."""
+        loop_local = LoopLocal(object)
+
+        async def get_twice():
+            return loop_local.get(), loop_local.get()
+
+        first, again = asyncio.run(get_twice())
+        second, _ = asyncio.run(get_twice())
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, second)
+
+    def test_sync_entry_point_closes_its_instances(self):
+        """Test that async_to_sync_closing closes what its throwaway loop created."""
+        loop_local = LoopLocal(Client, aclose=lambda client: client.aclose())
+
+        @async_to_sync_closing
+        async def get():
+            return loop_local.get()
+
+        first = get()
+        self.assertEqual(Client.closed, [first])
+
+        second = get()
+        self.assertIsNot(first, second)
+        self.assertEqual(Client.closed, [first, second])
+
+    def test_sync_entry_point_keeps_shared_instances(self):
+        """Test that an instance created before the call on a shared loop stays open."""
+        loop_local = LoopLocal(Client, aclose=lambda client: client.aclose())
+        @async_to_sync_closing
+        async def get():
+            return loop_local.get()
+
+        async def serve():
+            shared = loop_local.get()
+            # Sync code called from the loop's thread pool reuses that loop
+            return shared, await sync_to_async(get)()
+
+        shared, seen = asyncio.run(serve())
+
+        self.assertIs(seen, shared)
+        self.assertEqual(Client.closed, [])
+
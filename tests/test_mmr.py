@@ -0,0 +1,26 @@
+import numpy as np
+from django.test import SimpleTestCase
+from rag_pipeline.utils.mmr import mmr_select
+
+
+class MMRSelectTest(SimpleTestCase):
+    def setUp(self):
+        # Two near-duplicate candidates and one distinct, slightly less relevant one
+        self.embeddings = np.array([
+            [1.0, 0.0],
+            [0.99, 0.01],
+            [0.0, 1.0],
+        ], dtype=np.float32)
+        self.relevance = np.array([0.9, 0.89, 0.8], dtype=np.float32)
+
+    def test_prefers_diverse_candidates(self):
+        """Test that a near-duplicate loses to a distinct, slightly less relevant candidate."""
+        self.assertEqual(mmr_select(self.relevance, self.embeddings, 2, lambda_mult=0.5), [0, 2])
+
+    def test_lambda_one_is_relevance_order(self):
+        """Test that lambda 1.0 ignores diversity and ranks by relevance."""
+        self.assertEqual(mmr_select(self.relevance, self.embeddings, 3, lambda_mult=1.0), [0, 1, 2])
+
+    def test_k_larger_than_candidates(self):
+        """Test that selection stops at the number of candidates."""
+        self.assertEqual(len(mmr_select(self.relevance, self.embeddings, 10)), 3)
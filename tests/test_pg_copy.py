@@ -0,0 +1,79 @@
+from unittest import skipIf
+
+from django.test import SimpleTestCase
+from rag_pipeline.utils.pg_copy import copy_rows
+
+try:
+    from psycopg._copy_base import TextFormatter
+    from psycopg.adapt import Transformer
+except ImportError:  # pragma: no cover - depends on psycopg version
+    TextFormatter = None
+
+
+class FakeCopy:
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.rows = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.cursor.batches.append(self.rows)
+        return False
+
+    def write_row(self, row):
+        self.rows.append(row)
+
+
+class FakeCopyCursor:
+    def __init__(self):
+        self.sql = None
+        self.batches = []
+
+    def copy(self, sql):
+        self.sql = sql
+        return FakeCopy(self)
+
+
+class CopyRowsTest(SimpleTestCase):
+    ROWS = [
+        (1, 'line one\nline\ttwo \\ end', None),
+        (2, 'plain', 'MD&A'),
+    ]
+
+    def test_copy_rows_writes_rows(self):
+        """Test that rows are handed to write_row unchanged."""
+        cursor = FakeCopyCursor()
+        count = copy_rows(cursor, 'chunks', ['id', 'chunk_text', 'section'], self.ROWS)
+
+        self.assertEqual(count, 2)
+        self.assertEqual(cursor.sql, 'COPY chunks (id, chunk_text, section) FROM STDIN')
+        self.assertEqual(cursor.batches, [self.ROWS])
+
+    @skipIf(TextFormatter is None, "psycopg copy formatter not available")
+    def test_special_characters_escaped(self):
+        """Test that tabs, newlines, backslashes and None survive COPY text format."""
+        formatter = TextFormatter(Transformer())
+        for row in self.ROWS:
+            formatter.write_row(row)
+
+        self.assertEqual(
+            bytes(formatter.end()),
+            b'1\tline one\\nline\\ttwo \\\\ end\t\\N\n'
+            b'2\tplain\tMD&A\n'
+        )
+
+    def test_copy_rows_empty(self):
+        """Test that no COPY is issued when there are no rows."""
+        cursor = FakeCopyCursor()
+        self.assertEqual(copy_rows(cursor, 'chunks', ['id'], []), 0)
+        self.assertIsNone(cursor.sql)
+
+    def test_copy_rows_batches(self):
+        """Test that rows are split into one COPY per batch_size rows."""
+        cursor = FakeCopyCursor()
+        count = copy_rows(cursor, 'chunks', ['id'], ((i,) for i in range(5)), batch_size=2)
+
+        self.assertEqual(count, 5)
+        self.assertEqual(cursor.batches, [[(0,), (1,)], [(2,), (3,)], [(4,)]])
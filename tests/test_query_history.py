@@ -0,0 +1,27 @@
+from unittest.mock import patch
+from django.test import SimpleTestCase, override_settings
+from rag_pipeline.services import query_history
+
+
+class RecordQueryTest(SimpleTestCase):
+    @override_settings(QUERY_HISTORY_ASYNC=True)
+    def test_insert_is_handed_to_background_writer(self):
+        """Test that the request path only queues the history write."""
+        with patch.object(query_history, '_executor') as mock_executor, \
+                patch.object(query_history, '_save') as mock_save, \
+                patch.object(query_history.transaction, 'on_commit', side_effect=lambda func: func()) as mock_on_commit:
+            query_history.record_query(query='q', year=2023)
+
+        mock_on_commit.assert_called_once()
+        mock_executor.submit.assert_called_once_with(query_history._write, {'query': 'q', 'year': 2023})
+        mock_save.assert_not_called()
+
+    @override_settings(QUERY_HISTORY_ASYNC=False)
+    def test_inline_write_when_disabled(self):
+        """Test that disabling async history writes the row immediately."""
+        with patch.object(query_history, '_executor') as mock_executor, \
+                patch.object(query_history, '_save') as mock_save:
+            query_history.record_query(query='q', year=2023)
+
+        mock_save.assert_called_once_with({'query': 'q', 'year': 2023})
+        mock_executor.submit.assert_not_called()
@@ -0,0 +1,125 @@
+from contextlib import nullcontext
+from unittest.mock import AsyncMock, MagicMock, patch
+from django.test import SimpleTestCase, override_settings
+from rag_pipeline.services.query_processor import QueryProcessor
+from rag_pipeline.utils.hnsw import EF_SEARCH_MAX
+from rag_pipeline.utils.semantic_cache import SemanticQueryCache
+
+
+def _row(similarity):
+    return ('chunk-id', 'Revenue grew.', 'md&a', None, 'Apple Inc.', 2023, None, similarity)
+
+
+@override_settings(RETRIEVAL_MMR_ENABLED=False, RETRIEVAL_DEEPEN_THRESHOLD=0.6, RETRIEVAL_DEEPEN_EF_SEARCH=200)
+@patch('rag_pipeline.services.query_processor.ef_search_for_top_k', return_value=40)
+@patch('rag_pipeline.services.query_processor.transaction.atomic', return_value=nullcontext())
+@patch('rag_pipeline.services.query_processor.connection')
+class RetrieveChunksDeepeningTest(SimpleTestCase):
+    def setUp(self):
+        self.processor = QueryProcessor.__new__(QueryProcessor)
+        self.processor.embedding_service = MagicMock()
+        self.processor.embedding_service.format_for_pgvector.return_value = '[0.1]'
+
+    def _run(self, similarity=0.8):
+        with patch.object(self.processor, '_search_embeddings', return_value=[_row(similarity)]) as mock_search:
+            chunks = self.processor._retrieve_chunks([0.1], 2023, 5)
+        return chunks, mock_search
+
+    def test_single_search_carries_both_ef_searches(self, *mocks):
+        """Test that retrieval is one search given the cheap and the deep ef_search."""
+        chunks, mock_search = self._run()
+
+        mock_search.assert_called_once()
+        self.assertEqual(mock_search.call_args.args[4:6], (40, 200))
+        self.assertEqual(chunks[0]['similarity_score'], 0.8)
+
+    @override_settings(RETRIEVAL_DEEPEN_EF_SEARCH=5000)
+    def test_deep_ef_search_capped(self, *mocks):
+        """Test that the deep ef_search is capped at pgvector's maximum."""
+        _, mock_search = self._run()
+
+        self.assertEqual(mock_search.call_args.args[5], EF_SEARCH_MAX)
+
+    def test_search_is_one_statement(self, mock_connection, *mocks):
+        """Test that both HNSW passes run in one statement with the deepen threshold bound."""
+        cursor = MagicMock()
+        cursor.fetchall.return_value = [_row(0.4)]
+
+        rows = self.processor._search_embeddings(cursor, '[0.1]', 2023, 5, 40, 200, False)
+
+        cursor.execute.assert_called_once()
+        sql, params = cursor.execute.call_args.args
+        self.assertIn('search_year_embeddings(', sql)
+        self.assertEqual(params, ['[0.1]', 2023, 5, 40, 200, 0.6])
+        self.assertEqual(rows, [_row(0.4)])
+
+
+class WordEncoding:
+    """Stand-in tokenizer: one token per word."""
+
+    def encode(self, text):
+        return text.split()
+
+    def decode(self, tokens):
+        return ' '.join(tokens)
+
+
+@override_settings(QUERY_MAX_EMBEDDING_TOKENS=4)
+class TruncateForEmbeddingTest(SimpleTestCase):
+    def setUp(self):
+        self.processor = QueryProcessor.__new__(QueryProcessor)
+        self.processor.encoding = WordEncoding()
+
+    def test_short_query_unchanged(self):
+        """Test that queries within the token cap are embedded as-is."""
+        self.assertEqual(self.processor._truncate_for_embedding('Apple revenue in 2023'), 'Apple revenue in 2023')
+
+    def test_long_query_truncated(self):
+        """Test that queries over the token cap are cut to the first max tokens."""
+        self.assertEqual(
+            self.processor._truncate_for_embedding('What was Apple total net revenue in 2023'),
+            'What was Apple total'
+        )
+
+
+def _chunk(chunk_id):
+    return {
+        'chunk_id': chunk_id, 'chunk_text': 'Revenue grew.', 'section': 'md&a', 'subsection': None,
+        'company': 'Apple Inc.', 'year': 2023, 'filing_date': None, 'similarity_score': 0.8
+    }
+
+
+@patch('rag_pipeline.services.query_processor.get_semantic_cache', return_value=None)
+class SpeculativeAnswerTest(SimpleTestCase):
+    def setUp(self):
+        self.processor = QueryProcessor.__new__(QueryProcessor)
+        self.processor.encoding = WordEncoding()
+        self.processor.embedding_service = MagicMock()
+        self.processor.embedding_service.agenerate_embedding = AsyncMock(return_value=[1.0, 0.0])
+        self.processor.llm_service = MagicMock()
+        self.processor.llm_service.agenerate_answer = AsyncMock(
+            side_effect=lambda query, chunks: f"answer from {chunks[0]['chunk_id']}"
+        )
+
+        self.retrieval_cache = SemanticQueryCache(max_entries=4, threshold=0.9, ttl_seconds=60, dimensions=2)
+        self.retrieval_cache.set([1.0, 0.0], 2023, 5, {'chunks': [_chunk('a')]})
+        patcher = patch('rag_pipeline.services.query_processor.get_retrieval_cache', return_value=self.retrieval_cache)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_matching_retrieval_keeps_speculative_answer(self, mock_semantic_cache):
+        """Test that the speculative answer is used when retrieval returns the same chunks."""
+        with patch.object(self.processor, '_retrieve_chunks', return_value=[_chunk('a')]):
+            result = await self.processor.aprocess_query('Apple revenue', 2023, 5)
+
+        self.assertEqual(result['answer'], 'answer from a')
+        self.processor.llm_service.agenerate_answer.assert_called_once()
+
+    async def test_different_retrieval_restarts_answer(self, mock_semantic_cache):
+        """Test that the answer is regenerated when retrieval returns other chunks."""
+        with patch.object(self.processor, '_retrieve_chunks', return_value=[_chunk('b')]):
+            result = await self.processor.aprocess_query('Apple revenue', 2023, 5)
+
+        self.assertEqual(result['answer'], 'answer from b')
+        self.assertEqual(self.processor.llm_service.agenerate_answer.call_count, 2)
+        self.assertEqual(self.retrieval_cache.get([1.0, 0.0], 2023, 5)['chunks'][0]['chunk_id'], 'b')
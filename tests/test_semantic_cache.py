@@ -0,0 +1,45 @@
+from unittest.mock import patch
+import numpy as np
+from django.test import SimpleTestCase
+from rag_pipeline.utils.semantic_cache import SemanticQueryCache
+
+
+def _vector(*values):
+    vector = np.zeros(8, dtype=np.float32)
+    vector[:len(values)] = values
+    return vector
+
+
+class SemanticQueryCacheTest(SimpleTestCase):
+    def setUp(self):
+        self.cache = SemanticQueryCache(max_entries=2, threshold=0.97, ttl_seconds=60, dimensions=8)
+
+    def test_similar_query_hits(self):
+        """Test that a near-identical embedding returns the cached result."""
+        self.cache.set(_vector(1.0, 0.0), 2023, 5, {'answer': 'cached'})
+
+        self.assertEqual(self.cache.get(_vector(1.0, 0.05), 2023, 5), {'answer': 'cached'})
+        self.assertIsNone(self.cache.get(_vector(1.0, 1.0), 2023, 5))
+
+    def test_year_and_top_k_must_match(self):
+        """Test that results are only reused for the same filters."""
+        self.cache.set(_vector(1.0), 2023, 5, {'answer': 'cached'})
+
+        self.assertIsNone(self.cache.get(_vector(1.0), 2024, 5))
+        self.assertIsNone(self.cache.get(_vector(1.0), 2023, 10))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        """Test that a full cache evicts the entry used least recently."""
+        with patch('rag_pipeline.utils.semantic_cache.time.monotonic', side_effect=[1.0, 2.0, 3.0, 4.0, 5.0, 6.0]):
+            self.cache.set(_vector(1.0), 2023, 5, {'answer': 'a'})
+            self.cache.set(_vector(0.0, 1.0), 2023, 5, {'answer': 'b'})
+            self.cache.get(_vector(1.0), 2023, 5)
+            self.cache.set(_vector(0.0, 0.0, 1.0), 2023, 5, {'answer': 'c'})
+            self.assertEqual(self.cache.get(_vector(1.0), 2023, 5), {'answer': 'a'})
+            self.assertIsNone(self.cache.get(_vector(0.0, 1.0), 2023, 5))
+
+    def test_expired_entries_miss(self):
+        """Test that entries older than the TTL are not returned."""
+        with patch('rag_pipeline.utils.semantic_cache.time.monotonic', side_effect=[0.0, 61.0]):
+            self.cache.set(_vector(1.0), 2023, 5, {'answer': 'cached'})
+            self.assertIsNone(self.cache.get(_vector(1.0), 2023, 5))
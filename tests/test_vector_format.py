@@ -0,0 +1,25 @@
+import numpy as np
+from django.test import SimpleTestCase
+from rag_pipeline.utils.vector_format import format_vector, normalize_vector
+
+
+class FormatVectorTest(SimpleTestCase):
+    def test_format_vector(self):
+        """Test that embeddings are rendered as pgvector text literals."""
+        self.assertEqual(format_vector([0.5, -1.25, 3.0]), '[0.5,-1.25,3]')
+
+    def test_format_vector_round_trips_float32(self):
+        """Test that formatted values parse back to the same float32 values."""
+        values = np.random.default_rng(0).standard_normal(1536).astype(np.float32)
+        parsed = np.array(format_vector(values)[1:-1].split(','), dtype=np.float32)
+        np.testing.assert_array_equal(parsed, values)
+
+
+class NormalizeVectorTest(SimpleTestCase):
+    def test_normalize_vector(self):
+        """Test that embeddings are scaled to unit length."""
+        np.testing.assert_allclose(normalize_vector([3.0, 4.0]), [0.6, 0.8], rtol=1e-6)
+
+    def test_normalize_zero_vector(self):
+        """Test that a zero vector is returned unchanged instead of dividing by zero."""
+        np.testing.assert_array_equal(normalize_vector([0.0, 0.0]), [0.0, 0.0])
@@ -0,0 +1,28 @@
+from unittest.mock import MagicMock, patch
+from django.test import SimpleTestCase
+from rag_pipeline.utils.vector_types import register_vector_types
+
+
+@patch('rag_pipeline.utils.vector_types.register_halfvec_info')
+@patch('rag_pipeline.utils.vector_types.TypeInfo.fetch')
+class RegisterVectorTypesTest(SimpleTestCase):
+    def test_registers_halfvec_once(self, mock_fetch, mock_register):
+        """Test that adapters are registered on a new connection and not looked up again."""
+        raw_connection = MagicMock()
+        raw_connection.adapters.types.get.return_value = None
+
+        self.assertTrue(register_vector_types(raw_connection))
+        mock_register.assert_called_once_with(raw_connection, mock_fetch.return_value)
+
+        raw_connection.adapters.types.get.return_value = mock_fetch.return_value
+        self.assertTrue(register_vector_types(raw_connection))
+        mock_fetch.assert_called_once()
+
+    def test_missing_extension(self, mock_fetch, mock_register):
+        """Test that a database without the vector extension is left unchanged."""
+        raw_connection = MagicMock()
+        raw_connection.adapters.types.get.return_value = None
+        mock_fetch.return_value = None
+
+        self.assertFalse(register_vector_types(raw_connection))
+        mock_register.assert_not_called()
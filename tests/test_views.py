@@ -1,8 +1,10 @@
-from django.test import TestCase
+from unittest.mock import AsyncMock, PropertyMock, patch
+from django.core.cache import cache
+from django.test import SimpleTestCase
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
-from rag_pipeline.models import Document, QueryHistory
+from rag_pipeline.views import STATS_CACHE_KEY, StatsView
 
 
 class HealthViewTest(APITestCase):
@@ -54,3 +56,49 @@ class QueryViewTest(APITestCase):
         self.assertIn('answer', response.data)
         self.assertIn('sources', response.data)
         self.assertIn('confidence', response.data)
+
+
+class AsyncQueryViewTest(SimpleTestCase):
+    @patch('rag_pipeline.views.record_query')
+    @patch('rag_pipeline.apps.RagPipelineConfig.query_processor', new_callable=PropertyMock)
+    def test_query_runs_async_pipeline(self, mock_query_processor, mock_record_query):
+        """Test that the query view awaits the shared async pipeline and records history."""
+        mock_query_processor.return_value.aprocess_query = AsyncMock(return_value={
+            'answer': 'Revenue was $383B.',
+            'sources': [],
+            'confidence': 0.9
+        })
+
+        response = self.client.post(
+            reverse('query'),
+            {'query': 'What was Apple revenue in 2023?', 'year': 2023, 'top_k': 5},
+            content_type='application/json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['answer'], 'Revenue was $383B.')
+        mock_query_processor.return_value.aprocess_query.assert_awaited_once_with('What was Apple revenue in 2023?', 2023, 5)
+        mock_record_query.assert_called_once()
+
+
+class CachedStatsViewTest(SimpleTestCase):
+    def setUp(self):
+        cache.delete(STATS_CACHE_KEY)
+        self.addCleanup(cache.delete, STATS_CACHE_KEY)
+
+    @patch.object(StatsView, '_compute_stats')
+    def test_stats_are_cached(self, mock_compute_stats):
+        """Test that repeated stats requests reuse the cached counts."""
+        mock_compute_stats.return_value = {
+            'documents_processed': 2,
+            'total_chunks': 40,
+            'total_queries': 7,
+            'avg_response_time_ms': 123.46,
+        }
+
+        first = self.client.get(reverse('stats'))
+        second = self.client.get(reverse('stats'))
+
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.json()['total_chunks'], 40)
+        mock_compute_stats.assert_called_once()